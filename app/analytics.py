@@ -0,0 +1,175 @@
+"""
+과거 조 편성의 공정성 지표를 NumPy로 벡터화해 계산한다.
+
+기록을 (조 x 참가자) 소속 행렬 B로 만든 뒤 B^T B로 만남 횟수 행렬을, 조별 시간 감쇠
+계수를 곱한 B^T (f * B)로 최근성 합 행렬을 한 번에 구한다. 가중치 변환은
+TeamGenerator._calculate_time_decay_weight와 _group_cost를 그대로 벡터화한 것이다.
+압축된 집계(app.compaction)가 주어지면 쌍별 횟수/최근성 합을 두 행렬에 더한다.
+"""
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .team_generator import TeamGenerator
+
+
+def _record_date(record: Dict[str, Any]) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(record["date"][:10]).date()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def cooccurrence_index(
+    generator: TeamGenerator,
+    participants: List[str],
+    history: List[Dict[str, Any]],
+    current_date: Optional[date] = None,
+    aggregates: Optional[Dict[str, Any]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """
+    참가자 x 참가자 만남 횟수 행렬과 시간 감쇠 최근성 합 행렬을 계산한다.
+
+    Returns:
+        (counts, recency, membership, group_session, sessions)
+        - membership: (조 수, 참가자 수) 0/1 소속 행렬
+        - group_session: 각 조가 속한 세션 번호
+        - sessions: 날짜를 해석할 수 있는 기록 목록 (group_session의 인덱스 대상)
+    """
+    index = {p: i for i, p in enumerate(participants)}
+    n = len(participants)
+    today = current_date or date.today()
+
+    sessions = []
+    session_dates = []
+    for record in history:
+        record_date = _record_date(record)
+        if record_date is not None and isinstance(record.get("groups"), list):
+            sessions.append(record)
+            session_dates.append(record_date)
+
+    rows = []
+    group_session = []
+    group_dates = []
+    for s, record in enumerate(sessions):
+        for group in record["groups"]:
+            cols = [index[p] for p in group if p in index]
+            if len(cols) < 2:
+                continue
+            rows.append(cols)
+            group_session.append(s)
+            group_dates.append(session_dates[s])
+
+    membership = np.zeros((len(rows), n), dtype=np.float64)
+    for r, cols in enumerate(rows):
+        membership[r, cols] = 1.0
+
+    # 주차 계산은 TeamGenerator와 동일하게 가장 오래된 기록을 Week 1로 둔다
+    base_dates = list(session_dates)
+    if aggregates and aggregates.get("pairs"):
+        base_dates.append(datetime.fromisoformat(aggregates["base_date"]).date())
+    base = min(base_dates) if base_dates else today
+    current_week = (today - base).days // 7 + 1
+    weeks = np.array([(d - base).days // 7 + 1 for d in group_dates], dtype=np.float64)
+    weeks_ago = np.maximum(current_week - weeks, 0)
+    decay = generator.decay_rate ** weeks_ago
+
+    counts = membership.T @ membership
+    recency = membership.T @ (membership * decay[:, None])
+    if aggregates and aggregates.get("pairs"):
+        anchor_week = (datetime.fromisoformat(aggregates["anchor_date"]).date() - base).days // 7 + 1
+        shift = generator.decay_rate ** max(current_week - anchor_week, 0)
+        for a, b, count, recency_at_anchor, _ in aggregates["pairs"]:
+            if a in index and b in index:
+                i, j = index[a], index[b]
+                counts[i, j] += count
+                counts[j, i] += count
+                recency[i, j] += recency_at_anchor * shift
+                recency[j, i] += recency_at_anchor * shift
+    np.fill_diagonal(counts, 0)
+    np.fill_diagonal(recency, 0)
+    return counts, recency, membership, np.array(group_session, dtype=np.int64), sessions
+
+
+def pair_cost_matrix(generator: TeamGenerator, counts: np.ndarray, recency: np.ndarray, lam: float) -> np.ndarray:
+    """만남 횟수/최근성 행렬로부터 현재 가중치 기준 쌍별 비용 행렬을 계산"""
+    frequency_score = 1 - np.exp(-0.7 * counts)
+    recency_score = 1 - np.exp(-generator.recency_scale * recency)
+    weight = generator.frequency_weight * frequency_score + generator.recency_weight * recency_score
+    weight = np.where(counts > 0, weight, generator.first_meeting_bonus)
+    cost = np.where(weight < 0, weight, 1 - np.exp(-lam * weight))
+    np.fill_diagonal(cost, 0)
+    return cost
+
+
+def fairness_report(
+    generator: TeamGenerator,
+    participants: List[str],
+    history: List[Dict[str, Any]],
+    lam: float = 0.7,
+    current_date: Optional[date] = None,
+    aggregates: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """참가자별/전체 공정성 지표와 과거 세션별 비용을 계산"""
+    n = len(participants)
+    counts, recency, membership, group_session, sessions = cooccurrence_index(
+        generator, participants, history, current_date, aggregates
+    )
+    cost = pair_cost_matrix(generator, counts, recency, lam)
+
+    met = counts > 0
+    partners_met = met.sum(axis=1)
+    total_meetings = counts.sum(axis=1)
+    max_repeat = counts.max(axis=1) if n else np.zeros(0)
+    sessions_attended = np.zeros(n)
+    if len(group_session):
+        # 세션 x 참가자 참석 행렬 (조 소속 행렬을 세션 단위로 합침)
+        attendance = np.zeros((len(sessions), n))
+        np.add.at(attendance, group_session, membership)
+        sessions_attended = (attendance > 0).sum(axis=0)
+
+    per_participant = {}
+    for i, p in enumerate(participants):
+        per_participant[p] = {
+            "sessions_attended": int(sessions_attended[i]),
+            "total_meetings": int(total_meetings[i]),
+            "partners_met": int(partners_met[i]),
+            "partners_not_met": int(n - 1 - partners_met[i]),
+            "max_repeat": int(max_repeat[i]),
+        }
+
+    upper = np.triu_indices(n, k=1)
+    pair_counts = counts[upper].astype(np.int64)
+    total_pairs = len(pair_counts)
+    pairs_met = int((pair_counts > 0).sum())
+    distribution = np.bincount(pair_counts).tolist() if total_pairs else []
+
+    # 세션 비용: 각 조의 쌍별 비용 합 (b^T C b / 2)을 세션별로 합산
+    session_costs = np.zeros(len(sessions))
+    if len(group_session):
+        group_costs = ((membership @ cost) * membership).sum(axis=1) / 2
+        np.add.at(session_costs, group_session, group_costs)
+
+    unmet = np.argwhere(np.triu(~met, k=1))
+    summary = {
+        "participants": n,
+        "total_pairs": total_pairs,
+        "pairs_met": pairs_met,
+        "pairs_not_met": total_pairs - pairs_met,
+        "met_fraction": pairs_met / total_pairs if total_pairs else 0.0,
+        "max_repeat": int(pair_counts.max()) if total_pairs else 0,
+        "meeting_distribution": distribution,
+        "partners_met_mean": float(partners_met.mean()) if n else 0.0,
+        "partners_met_std": float(partners_met.std()) if n else 0.0,
+    }
+
+    return {
+        "summary": summary,
+        "participants": per_participant,
+        "unmet_pairs": [[participants[i], participants[j]] for i, j in unmet],
+        "session_costs": [
+            {"date": record["date"], "cost": float(session_costs[s])}
+            for s, record in enumerate(sessions)
+        ],
+    }
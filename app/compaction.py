@@ -0,0 +1,159 @@
+"""
+히스토리 압축(보존 정책).
+
+보존 기간(horizon)보다 오래된 기록을 쌍별 집계(만남 횟수, 기준 주차 시점의 감쇠 최근성 합,
+마지막 날짜)로 접어 별도 파일에 저장하고 team_history.json에서는 제거한다.
+가중치의 최근성 항은 decay_rate ** weeks_ago로 감쇠하므로
+
+    sum(decay ** (현재 주차 - d)) = decay ** (현재 주차 - 기준 주차) * sum(decay ** (기준 주차 - d))
+
+가 성립하고, 주차 계산의 Week 1(가장 오래된 기록 날짜)도 집계에 보존하므로 감쇠율이 바뀌지 않는 한
+압축 전후의 가중치는 부동소수점 오차 범위에서 같다. 히스토리 파일과 로드 시간은 보존 기간 안의
+기록 수로 제한되고, 집계 크기는 참가자 쌍의 수를 넘지 않는다.
+
+사용 예:
+    python -m app.compaction --horizon-days 180
+    python -m app.compaction --horizon-days 90 --dry-run
+"""
+import argparse
+import contextlib
+import io
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+from .history_store import HistoryStore
+from .team_generator import TeamGenerator
+
+DEFAULT_AGGREGATES_FILE = "data/history_aggregates.json"
+
+
+def _record_date(record: Dict[str, Any]) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(record["date"][:10]).date()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def compact_history(
+    history: List[Dict[str, Any]],
+    aggregates: Optional[Dict[str, Any]],
+    horizon_days: int,
+    decay_rate: float,
+    today: Optional[date] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], int]:
+    """
+    horizon_days보다 오래된 기록을 집계로 접는다.
+
+    Returns:
+        (남은 기록 목록, 새 집계, 압축된 기록 수)
+    """
+    today = today or date.today()
+    cutoff = today - timedelta(days=horizon_days)
+
+    old: List[Tuple[date, Dict[str, Any]]] = []
+    recent: List[Dict[str, Any]] = []
+    for record in history:
+        record_date = _record_date(record)
+        if record_date is not None and record_date < cutoff:
+            old.append((record_date, record))
+        else:
+            recent.append(record)
+
+    if not old:
+        return history, aggregates, 0
+
+    # Week 1은 압축된 기록 중 가장 오래된 날짜 (기존 집계가 있으면 그 시작 날짜와 비교)
+    base = min(d for d, _ in old)
+    if aggregates:
+        base = min(base, datetime.fromisoformat(aggregates["base_date"]).date())
+
+    def week(d: date) -> int:
+        return (d - base).days // 7 + 1
+
+    anchor_week = week(cutoff)
+    pairs: Dict[Tuple[str, str], List[Any]] = {}
+    if aggregates:
+        # 기존 집계의 최근성 합을 새 기준 주차로 옮김
+        shift = decay_rate ** max(anchor_week - week(datetime.fromisoformat(aggregates["anchor_date"]).date()), 0)
+        for a, b, count, recency, last in aggregates.get("pairs", []):
+            pairs[(a, b)] = [count, recency * shift, last]
+
+    for record_date, record in old:
+        factor = decay_rate ** max(anchor_week - week(record_date), 0)
+        record_date_str = record_date.isoformat()
+        for group in record.get("groups", []):
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    if group[i] == group[j]:
+                        continue
+                    key = tuple(sorted((group[i], group[j])))
+                    entry = pairs.setdefault(key, [0, 0.0, record_date_str])
+                    entry[0] += 1
+                    entry[1] += factor
+                    if record_date_str > entry[2]:
+                        entry[2] = record_date_str
+
+    new_aggregates = {
+        "base_date": base.isoformat(),
+        "anchor_date": cutoff.isoformat(),
+        "decay_rate": decay_rate,
+        "compacted_records": (aggregates or {}).get("compacted_records", 0) + len(old),
+        "pairs": [[a, b, count, recency, last] for (a, b), (count, recency, last) in sorted(pairs.items())],
+    }
+    return recent, new_aggregates, len(old)
+
+
+def max_weight_difference(
+    before: Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]],
+    after: Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]],
+    decay_rate: float
+) -> float:
+    """압축 전후 (기록, 집계)로 계산한 전체 참가자 쌍 가중치의 최대 차이"""
+    names = sorted({p for record in before[0] for group in record.get("groups", []) for p in group}
+                   | {p for pair in (before[1] or {}).get("pairs", []) for p in pair[:2]})
+    weights = []
+    for history, aggregates in (before, after):
+        generator = TeamGenerator()
+        generator.decay_rate = decay_rate
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.load_past_cooccurrence_from_records(names, history, aggregates=aggregates)
+            weights.append(generator._get_time_decay_weights(names))
+    return max(
+        (abs(weights[0][p][q] - weights[1][p][q]) for p in names for q in names if p != q),
+        default=0.0
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="오래된 조 편성 기록을 쌍별 집계로 압축")
+    parser.add_argument("--history", default="data/team_history.json", help="팀 히스토리 파일")
+    parser.add_argument("--aggregates", default=DEFAULT_AGGREGATES_FILE, help="쌍별 집계 파일")
+    parser.add_argument("--horizon-days", type=int, default=180, help="원본 기록을 보존할 기간(일)")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="압축 전후 허용 가중치 차이")
+    parser.add_argument("--dry-run", action="store_true", help="파일을 바꾸지 않고 결과만 확인")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.history, aggregates_path=args.aggregates)
+    decay_rate = TeamGenerator().decay_rate
+    history = store.load()
+    aggregates = store.aggregates()
+    recent, new_aggregates, compacted = compact_history(history, aggregates, args.horizon_days, decay_rate)
+    if not compacted:
+        print(f"{args.horizon_days}일보다 오래된 기록이 없습니다.")
+        return
+
+    diff = max_weight_difference((history, aggregates), (recent, new_aggregates), decay_rate)
+    print(f"압축 대상 {compacted}건, 남는 기록 {len(recent)}건, 집계 쌍 {len(new_aggregates['pairs'])}개")
+    print(f"압축 전후 최대 가중치 차이: {diff:.3e} (허용 {args.tolerance:.1e})")
+    if diff > args.tolerance:
+        print("허용 오차를 넘어 압축을 중단합니다.")
+        raise SystemExit(1)
+    if args.dry_run:
+        return
+
+    store.compact(args.horizon_days, decay_rate)
+    print(f"압축 완료: {args.history}, {args.aggregates}")
+
+
+if __name__ == "__main__":
+    main()
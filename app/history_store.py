@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Tuple, Optional
+
+
+def _parse_record_datetime(value: Any) -> Optional[datetime]:
+    """기록의 date 필드를 datetime으로 변환 (날짜만 있거나 해석할 수 없는 경우 처리)"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value[:10])
+        except ValueError:
+            return None
+
+
+def _read_json(path: str, default: Any) -> Any:
+    try:
+        with open(path, "r", encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path: str, content: Any) -> None:
+    """임시 파일에 쓴 뒤 교체 (쓰는 도중 읽는 쪽이 잘린 파일을 보지 않도록)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump(content, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class HistoryStore:
+    """
+    team_history.json을 파일 버전(수정 시각 + 크기) 기준으로 캐시하는 저장소.
+
+    파일이 바뀌지 않았다면 다시 파싱하지 않고 메모리의 기록을 돌려주며, version()은
+    분석 결과 등 파생 데이터의 캐시 키로 사용한다. 반환된 기록 목록은 공유 객체이므로
+    호출하는 쪽에서 수정하지 않는다 (쓰기는 append/delete/replace로만).
+
+    로드할 때 기록을 생성 시각 순으로 정렬한 날짜 인덱스를 함께 만들어 두므로
+    "오늘 데이터가 있는지", "오늘 마지막 생성 시각", 특정 날짜 기록 찾기는 이분 탐색으로 처리된다.
+
+    aggregates_path가 주어지면 보존 기간이 지나 압축된 쌍별 집계 파일(app.compaction)도 함께
+    관리하며, 집계 파일이 바뀌어도 version()이 달라진다.
+    """
+
+    def __init__(self, path: str, aggregates_path: Optional[str] = None):
+        self.path = path
+        self.aggregates_path = aggregates_path
+        self._aggregates: Optional[Dict[str, Any]] = None
+        self._lock = threading.RLock()
+        self._version: str = None
+        self._history: List[Dict[str, Any]] = []
+        # 날짜 인덱스: 생성 시각 오름차순 (시각, 기록 위치)
+        self._index_times: List[datetime] = []
+        self._index_positions: List[int] = []
+
+    def version(self) -> str:
+        """현재 파일 버전 문자열 (파일이 없으면 "missing")"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return "missing"
+        version = f"{st.st_mtime_ns}-{st.st_size}"
+        if self.aggregates_path:
+            try:
+                ast = os.stat(self.aggregates_path)
+                version += f"+{ast.st_mtime_ns}-{ast.st_size}"
+            except FileNotFoundError:
+                pass
+        return version
+
+    def load(self) -> List[Dict[str, Any]]:
+        """기록 목록 반환 (파일 버전이 같으면 캐시 사용)"""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """(버전, 기록 목록)을 한 번에 반환해 버전과 내용이 어긋나지 않도록 한다"""
+        with self._lock:
+            self._refresh()
+            return self._version, self._history
+
+    def _refresh(self) -> None:
+        version = self.version()
+        if version == self._version:
+            return
+        history = _read_json(self.path, [])
+        if not isinstance(history, list):
+            history = []
+        self._aggregates = _read_json(self.aggregates_path, None) if self.aggregates_path else None
+        self._set(history, version)
+        print(f"[디버깅] 히스토리 캐시 갱신: {len(history)}건 (버전 {version})")
+
+    def _set(self, history: List[Dict[str, Any]], version: str) -> None:
+        entries = []
+        for pos, record in enumerate(history):
+            dt = _parse_record_datetime(record.get("date")) if isinstance(record, dict) else None
+            if dt is not None:
+                entries.append((dt, pos))
+        entries.sort()
+        self._history = history
+        self._version = version
+        self._index_times = [dt for dt, _ in entries]
+        self._index_positions = [pos for _, pos in entries]
+
+    def _write(self, history: List[Dict[str, Any]]) -> None:
+        """임시 파일에 쓴 뒤 교체하고 캐시/인덱스를 새 내용으로 갱신 (락 안에서 호출)"""
+        _write_json(self.path, history)
+        self._set(history, self.version())
+
+    def aggregates(self) -> Optional[Dict[str, Any]]:
+        """압축된 쌍별 집계 (없으면 None)"""
+        with self._lock:
+            self._refresh()
+            return self._aggregates
+
+    def compact(self, horizon_days: int, decay_rate: float) -> int:
+        """보존 기간이 지난 기록을 쌍별 집계로 접어 저장하고, 압축된 기록 수를 반환"""
+        from .compaction import compact_history
+
+        with self._lock:
+            self._refresh()
+            recent, aggregates, compacted = compact_history(
+                self._history, self._aggregates, horizon_days, decay_rate
+            )
+            if compacted:
+                # 집계를 먼저 저장해야 중간에 실패해도 압축된 기록이 사라지지 않음
+                _write_json(self.aggregates_path, aggregates)
+                self._aggregates = aggregates
+                self._write(recent)
+                print(f"[디버깅] 히스토리 압축: {compacted}건을 집계로 이동, 남은 기록 {len(recent)}건")
+            return compacted
+
+    def _day_range(self, day: date) -> Tuple[int, int]:
+        start = datetime.combine(day, datetime.min.time())
+        return bisect_left(self._index_times, start), bisect_left(self._index_times, start + timedelta(days=1))
+
+    def latest_on(self, day: date) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """해당 날짜에 생성된 가장 최근 기록 (기록 위치, 기록). 없으면 None"""
+        with self._lock:
+            self._refresh()
+            lo, hi = self._day_range(day)
+            if lo == hi:
+                return None
+            pos = self._index_positions[hi - 1]
+            return pos, self._history[pos]
+
+    def positions_for_date(self, date_str: str) -> List[int]:
+        """date 필드가 date_str과 정확히 일치하는 기록 위치 목록"""
+        with self._lock:
+            self._refresh()
+            dt = _parse_record_datetime(date_str)
+            if dt is None:
+                return [pos for pos, record in enumerate(self._history) if record.get("date") == date_str]
+            lo = bisect_left(self._index_times, dt)
+            hi = bisect_right(self._index_times, dt)
+            return [
+                self._index_positions[k] for k in range(lo, hi)
+                if self._history[self._index_positions[k]].get("date") == date_str
+            ]
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """기록 추가 후 저장"""
+        with self._lock:
+            self._refresh()
+            self._write(self._history + [record])
+
+    def delete_by_date(self, date_str: str) -> List[Dict[str, Any]]:
+        """date 필드가 date_str과 일치하는 기록을 삭제 후 저장하고, 삭제된 기록 목록을 반환"""
+        with self._lock:
+            return self._delete_positions(self.positions_for_date(date_str))
+
+    def delete_latest_on(self, day: date) -> Optional[Dict[str, Any]]:
+        """해당 날짜의 가장 최근 기록을 삭제 후 저장하고, 삭제된 기록을 반환 (없으면 None)"""
+        with self._lock:
+            latest = self.latest_on(day)
+            if latest is None:
+                return None
+            return self._delete_positions([latest[0]])[0]
+
+    def _delete_positions(self, positions: List[int]) -> List[Dict[str, Any]]:
+        drop = set(positions)
+        removed = [r for pos, r in enumerate(self._history) if pos in drop]
+        if removed:
+            self._write([r for pos, r in enumerate(self._history) if pos not in drop])
+        return removed
+
+    def replace(self, history: List[Dict[str, Any]], clear_aggregates: bool = False) -> None:
+        """전체 기록을 교체 후 저장 (clear_aggregates면 압축된 집계 파일도 삭제)"""
+        with self._lock:
+            if clear_aggregates and self.aggregates_path and os.path.exists(self.aggregates_path):
+                os.remove(self.aggregates_path)
+                self._aggregates = None
+            self._write(list(history))
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from .models import (
     Participant,
     TeamGenerationRequest,
@@ -9,12 +10,20 @@ from .models import (
     TeamHistoryItem,
     TeamHistoryResponse,
     DeleteHistoryRequest,
-    TodayDataDeleteResponse
+    TodayDataDeleteResponse,
+    FairnessResponse
 )
-from .team_generator import TeamGenerator
-from typing import List, Dict, Any
+from .team_generator import TeamGenerator, ConstraintError, EliteCache
+from .history_store import HistoryStore
+from .analytics import fairness_report
+from .compaction import DEFAULT_AGGREGATES_FILE
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import json
 import os
+import threading
+import time
+import uuid
 from datetime import date
 
 app = FastAPI(title="Team Generator API")
@@ -32,10 +41,37 @@ app.add_middleware(
 PARTICIPANTS_FILE = "data/participants.json"
 ATTENDING_FILE = "data/attending_participants.json"
 TEAM_HISTORY_FILE = "data/team_history.json"
-COOCCURRENCE_FILE = "data/cooccurrence.json"
+HISTORY_AGGREGATES_FILE = DEFAULT_AGGREGATES_FILE
+
+# 원본 기록 보존 기간(일). 지정하면 시작 시 이보다 오래된 기록을 쌍별 집계로 압축 (미지정 시 압축하지 않음)
+HISTORY_RETENTION_DAYS = int(os.environ["HISTORY_RETENTION_DAYS"]) if os.environ.get("HISTORY_RETENTION_DAYS") else None
+
+# 재생성용 엘리트 해 캐시 (전역 생성기와 작업별 생성기가 공유)
+elite_cache = EliteCache()
 
 # 전역 TeamGenerator 인스턴스
-team_generator = TeamGenerator(team_history_file=TEAM_HISTORY_FILE)
+team_generator = TeamGenerator(team_history_file=TEAM_HISTORY_FILE, elite_cache=elite_cache)
+
+# 히스토리 저장소 (파일 버전 기반 캐시 + 날짜 인덱스, 공동 참여 데이터는 여기서 파생)
+history_store = HistoryStore(TEAM_HISTORY_FILE, aggregates_path=HISTORY_AGGREGATES_FILE)
+
+# 공정성 분석 결과 캐시: (히스토리 버전, 기준 날짜, 참가자 목록, lam) -> 결과
+fairness_cache: Dict[tuple, Dict[str, Any]] = {}
+# 워밍업 스레드와 요청 처리가 함께 쓰므로 보호
+fairness_cache_lock = threading.Lock()
+
+# 전역 team_generator 상태(공동 참여 데이터, 가중치 캐시)를 워밍업 스레드와 요청이 함께 쓰므로 보호
+generator_lock = threading.Lock()
+
+# 백그라운드 캐시 워밍업 진행 상태 (/api/ready에서 조회)
+WARMUP_STAGES = ["history", "cooccurrence", "weights", "fairness"]
+warmup_state: Dict[str, Any] = {
+    "ready": False,
+    "stage": "starting",
+    "progress": 0.0,
+    "error": None,
+    "elapsed": None,
+}
 
 # 파일이 존재하지 않으면 생성
 def ensure_file_exists(file_path: str, default_content):
@@ -43,6 +79,78 @@ def ensure_file_exists(file_path: str, default_content):
         with open(file_path, "w", encoding='utf-8') as f:
             json.dump(default_content, f, indent=2, ensure_ascii=False)
 
+# 목록이 정렬되어 있지 않을 때만 정렬 후 다시 저장
+def sort_file_if_needed(file_path: str):
+    with open(file_path, "r", encoding='utf-8') as f:
+        items = json.load(f)
+    if items != sorted(items):
+        items.sort()
+        with open(file_path, "w", encoding='utf-8') as f:
+            json.dump(items, f, indent=2, ensure_ascii=False)
+
+def read_json_list(file_path: str) -> List[str]:
+    try:
+        with open(file_path, "r", encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+def compute_fairness(participants: List[str], lam: float) -> Dict[str, Any]:
+    """히스토리 버전별로 캐시된 공정성 분석 결과를 반환"""
+    version, history = history_store.snapshot()
+    today = date.today().isoformat()
+    key = (version, today, tuple(participants), lam)
+
+    with fairness_cache_lock:
+        report = fairness_cache.get(key)
+    if report is None:
+        report = fairness_report(team_generator, participants, history, lam, aggregates=history_store.aggregates())
+        report["history_version"] = version
+        with fairness_cache_lock:
+            # 다른 히스토리 버전/날짜의 결과만 비우고, 같은 버전의 다른 참가자 목록/lam 결과는 유지
+            for stale in [k for k in fairness_cache if k[:2] != (version, today)]:
+                del fairness_cache[stale]
+            fairness_cache[key] = report
+    return report
+
+def warm_up_caches():
+    """히스토리 파싱, 참석자 공동 참여 데이터/가중치, 공정성 분석 캐시를 미리 만들어 둔다."""
+    start = time.perf_counter()
+
+    def enter(stage: str):
+        warmup_state["stage"] = stage
+        warmup_state["progress"] = WARMUP_STAGES.index(stage) / len(WARMUP_STAGES)
+
+    try:
+        enter("history")
+        if HISTORY_RETENTION_DAYS is not None:
+            history_store.compact(HISTORY_RETENTION_DAYS, team_generator.decay_rate)
+        version, history = history_store.snapshot()
+        aggregates = history_store.aggregates()
+
+        participants = read_json_list(PARTICIPANTS_FILE)
+        attending = read_json_list(ATTENDING_FILE)
+        with generator_lock:
+            # 등록 참가자 + 참석자 전체를 한 번에 로드해 두면 두 목록 모두 캐시로 처리됨
+            enter("cooccurrence")
+            everyone = sorted(set(participants) | set(attending))
+            team_generator.load_past_cooccurrence_from_records(everyone, history, version=version, aggregates=aggregates)
+            enter("weights")
+            team_generator._get_time_decay_weights(attending)
+
+        enter("fairness")
+        compute_fairness(participants, 0.7)
+    except Exception as e:
+        # 워밍업 실패는 치명적이지 않음 (요청 시점에 다시 계산됨)
+        warmup_state["error"] = str(e)
+        print(f"[디버깅] 캐시 워밍업 중 오류: {e}")
+
+    warmup_state["stage"] = "done"
+    warmup_state["progress"] = 1.0
+    warmup_state["elapsed"] = time.perf_counter() - start
+    warmup_state["ready"] = True
+    print(f"[디버깅] 캐시 워밍업 완료 ({warmup_state['elapsed']:.3f}s)")
+
 # 서버 시작 시 필요한 파일 초기화
 @app.on_event("startup")
 async def startup_event():
@@ -50,26 +158,21 @@ async def startup_event():
     ensure_file_exists(ATTENDING_FILE, [])
     ensure_file_exists(TEAM_HISTORY_FILE, [])
     
-    # 기존 파일 데이터 정렬
+    # 기존 파일 데이터 정렬 (이미 정렬된 경우 다시 쓰지 않음)
     try:
-        # 참가자 목록 정렬
-        with open(PARTICIPANTS_FILE, "r", encoding='utf-8') as f:
-            participants = json.load(f)
-        if participants:
-            participants.sort()
-            with open(PARTICIPANTS_FILE, "w", encoding='utf-8') as f:
-                json.dump(participants, f, indent=2, ensure_ascii=False)
-                
-        # 참석자 목록 정렬
-        with open(ATTENDING_FILE, "r", encoding='utf-8') as f:
-            attending = json.load(f)
-        if attending:
-            attending.sort()
-            with open(ATTENDING_FILE, "w", encoding='utf-8') as f:
-                json.dump(attending, f, indent=2, ensure_ascii=False)
+        sort_file_if_needed(PARTICIPANTS_FILE)
+        sort_file_if_needed(ATTENDING_FILE)
     except Exception as e:
         print(f"파일 정렬 중 오류 발생: {e}")
 
+    # 히스토리 파싱과 가중치 계산은 백그라운드에서 진행
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(warm_up_caches))
+
+@app.get("/api/ready")
+async def readiness():
+    """캐시 워밍업 진행 상태를 반환합니다. 준비가 끝나기 전에는 503을 반환합니다."""
+    return JSONResponse(status_code=200 if warmup_state["ready"] else 503, content=warmup_state)
+
 @app.get("/api")
 async def root():
     return {"message": "Team Generator API"}
@@ -207,265 +310,446 @@ async def get_cooccurrence_info(lam: float = 0.7, as_of: str | None = None) -> D
       - as_of: ISO 날짜(또는 날짜시간) 문자열. 제공 시 해당 시점까지의 기록으로 계산
     """
     participants = await get_participants()
-    team_generator.load_past_cooccurrence_from_history(participants, as_of_iso=as_of)
-    return team_generator.get_cooccurrence_info(participants, lam)
+    # 생성/워밍업 스레드가 generator_lock을 오래 잡을 수 있으므로 이벤트 루프가 아닌 워커 스레드에서 대기
+    return await asyncio.to_thread(cooccurrence_info_locked, participants, lam, as_of)
+
+def cooccurrence_info_locked(participants: List[str], lam: float, as_of: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """전역 생성기로 공동 참여 정보 계산 (워커 스레드에서 호출)"""
+    version, history = history_store.snapshot()
+    aggregates = history_store.aggregates()
+    with generator_lock:
+        team_generator.load_past_cooccurrence_from_records(
+            participants, history, as_of_iso=as_of, version=version, aggregates=aggregates
+        )
+        return team_generator.get_cooccurrence_info(participants, lam)
+
+@app.get("/api/fairness")
+async def get_fairness(lam: float = 0.7) -> FairnessResponse:
+    """과거 조 편성의 공정성 지표를 반환합니다.
+
+    참가자별 만남 분포, 아직 만나지 않은 쌍, 최대 반복 횟수와 현재 가중치 기준 과거 세션별
+    비용을 계산하며, 결과는 히스토리 버전별로 캐시됩니다.
+    """
+    participants = await get_participants()
+    # 캐시가 없으면 분석에 시간이 걸리므로 이벤트 루프가 아닌 워커 스레드에서 계산
+    return await asyncio.to_thread(compute_fairness, participants, lam)
 
-@app.post("/api/generate")
-async def generate_teams(request: TeamGenerationRequest) -> TeamGenerationResponse:
-    """새로운 팀을 생성합니다."""
-    # 과거 데이터 로드 (모든 기록 사용, 시간 감쇠 적용)
-    team_generator.load_past_cooccurrence_from_history(request.participants)
-    
-    # 팀 생성 방법 선택
+def resolve_method(request: TeamGenerationRequest) -> str:
+    """요청된 생성 방법을 참가자 수에 맞게 보정"""
     method_used = request.method
-    
     # 참가자가 너무 적은 경우 weighted_random 방식으로 강제 변경
-    if len(request.participants) < 8 and method_used == "simulated_annealing":
+    if len(request.participants) < 8 and method_used in ("simulated_annealing", "parallel_tempering", "batched_annealing"):
         method_used = "weighted_random"
-    
+    return method_used
+
+def run_generation(
+    request: TeamGenerationRequest,
+    generator: TeamGenerator,
+    progress_callback=None,
+    should_stop=None
+) -> Dict[str, Any]:
+    """과거 데이터 로드부터 조 생성, 공동 참여 정보 계산까지 수행 (동기 함수)
+
+    ConstraintError는 호출한 쪽에서 처리한다.
+    """
+    method_used = resolve_method(request)
+
     # SA 파라미터 설정
     sa_params = {}
     if request.sa_params:
         sa_params = request.sa_params
-    
-    # 새로운 시간 감쇠 시스템으로 팀 생성
-    groups = team_generator.generate_groups(request.participants, request.lam)
-    
+
+    version, history = history_store.snapshot()
+    # 과거 데이터 로드 (모든 기록 + 압축된 집계 사용, 시간 감쇠 적용 / 같은 히스토리 버전이면 캐시 사용)
+    generator.load_past_cooccurrence_from_records(
+        request.participants, history, version=version, aggregates=history_store.aggregates()
+    )
+
+    # 새로운 시간 감쇠 시스템으로 팀 생성 (제약 조건은 최적화 전에 실행 가능성 검사)
+    groups = generator.generate_groups(
+        request.participants,
+        request.lam,
+        must_link=request.must_link,
+        cannot_link=request.cannot_link,
+        sa_params=sa_params,
+        method=method_used,
+        progress_callback=progress_callback,
+        should_stop=should_stop,
+        regenerate=request.regenerate
+    )
+
     # 공동 참여 정보는 team_history.json에 저장되므로 별도 업데이트 불필요
-    cooccurrence_info = team_generator.get_cooccurrence_info(request.participants, request.lam)
-    
-    # 조 생성 기록 저장
-    await save_team_history(groups, method_used, request.lam, len(request.participants))
-    
-    return TeamGenerationResponse(
-        groups=groups,
-        cooccurrence_info=cooccurrence_info,
-        method_used=method_used
+    return {
+        "groups": groups,
+        "cooccurrence_info": generator.get_cooccurrence_info(request.participants, request.lam),
+        "method_used": method_used,
+        "optimization_stats": dict(generator.last_stats),
+        "history_version": version,
+    }
+
+def generation_key(request: TeamGenerationRequest) -> Tuple:
+    """같은 결과를 공유해도 되는 요청인지 판단하는 키 (참가자 집합, 파라미터, 제약 조건, 히스토리 버전)"""
+    return (
+        tuple(sorted(request.participants)),
+        request.lam,
+        resolve_method(request),
+        request.regenerate,
+        json.dumps(request.sa_params or {}, sort_keys=True),
+        tuple(sorted(tuple(sorted(group)) for group in request.must_link)),
+        tuple(sorted(tuple(sorted(pair)) for pair in request.cannot_link)),
+        history_store.version(),
     )
 
+# 멱등 키 결과 캐시 유지 시간(초)
+IDEMPOTENCY_TTL = 600
+
+class IdempotencyCache:
+    """Idempotency-Key 헤더별로 요청 키와 결과(진행 중인 작업 포함)를 짧은 시간 동안 보관"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Tuple, Any]] = {}
+
+    def get(self, idempotency_key: str, request_key: Tuple) -> Any:
+        """저장된 값 (없거나 만료되면 None). 같은 멱등 키로 다른 요청이 오면 422"""
+        now = time.monotonic()
+        for k in [k for k, (expires, _, _) in self._entries.items() if expires <= now]:
+            del self._entries[k]
+        entry = self._entries.get(idempotency_key)
+        if entry is None:
+            return None
+        # 히스토리 버전은 첫 요청이 기록을 저장하면서 바뀌므로 비교에서 제외
+        if entry[1][:-1] != request_key[:-1]:
+            raise HTTPException(status_code=422, detail="같은 Idempotency-Key로 다른 요청을 보낼 수 없습니다.")
+        return entry[2]
+
+    def put(self, idempotency_key: str, request_key: Tuple, value: Any):
+        self._entries[idempotency_key] = (time.monotonic() + self.ttl, request_key, value)
+
+    def discard(self, idempotency_key: str):
+        self._entries.pop(idempotency_key, None)
+
+# 진행 중인 동일 요청 (generation_key -> 생성 작업). 같은 키의 요청은 이 작업의 결과를 함께 받음
+inflight_generations: Dict[Tuple, asyncio.Task] = {}
+generate_idempotency = IdempotencyCache(IDEMPOTENCY_TTL)
+
+def run_generation_locked(request: TeamGenerationRequest) -> Dict[str, Any]:
+    """전역 생성기로 조 생성 (워커 스레드에서 호출)"""
+    with generator_lock:
+        return run_generation(request, team_generator)
+
+async def generate_and_save(request: TeamGenerationRequest) -> Dict[str, Any]:
+    """이벤트 루프를 막지 않도록 워커 스레드에서 생성한 뒤 기록을 한 번 저장"""
+    result = await asyncio.to_thread(run_generation_locked, request)
+    await save_team_history(
+        result["groups"], result["method_used"], request.lam, len(request.participants),
+        based_on_version=result.pop("history_version")
+    )
+    return result
+
+@app.post("/api/generate")
+async def generate_teams(
+    request: TeamGenerationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None)
+) -> TeamGenerationResponse:
+    """새로운 팀을 생성합니다.
+
+    같은 참가자/파라미터/히스토리 버전의 요청이 동시에 들어오면 최적화를 한 번만 실행하고
+    결과와 기록 저장을 공유합니다. Idempotency-Key 헤더를 보내면 일정 시간 동안 같은 키의
+    재시도에 저장된 결과를 그대로 돌려줍니다 (Idempotent-Replayed: true).
+    """
+    key = generation_key(request)
+    task = generate_idempotency.get(idempotency_key, key) if idempotency_key else None
+    if task is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        task = inflight_generations.get(key)
+        if task is None:
+            task = asyncio.create_task(generate_and_save(request))
+            inflight_generations[key] = task
+            task.add_done_callback(lambda _: inflight_generations.pop(key, None))
+        else:
+            print(f"[디버깅] 진행 중인 동일 요청에 합류 (참가자 {len(request.participants)}명)")
+        if idempotency_key:
+            generate_idempotency.put(idempotency_key, key, task)
+            # 실패한 결과는 보관하지 않음 (재시도 시 다시 생성)
+            task.add_done_callback(
+                lambda t: generate_idempotency.discard(idempotency_key) if t.exception() else None
+            )
 
-# 조 생성 기록 저장 함수
-async def save_team_history(groups: List[List[str]], method_used: str, lambda_value: float, participants_count: int):
-    """조 생성 기록을 저장합니다."""
     try:
-        # 기존 기록 불러오기
-        with open(TEAM_HISTORY_FILE, "r", encoding='utf-8') as f:
-            history = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        history = []
-    
+        # 한 요청이 끊겨도 함께 기다리는 요청을 위해 작업은 계속 진행
+        result = await asyncio.shield(task)
+    except ConstraintError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return TeamGenerationResponse(**result)
+
+
+# 비동기 조 생성 작업 (진행 상황 스트리밍용)
+MAX_JOBS = 50
+
+class GenerationJob:
+    """백그라운드 스레드에서 실행되는 조 생성 작업과 진행 이벤트 목록"""
+
+    def __init__(self, request: TeamGenerationRequest, loop: asyncio.AbstractEventLoop):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.key = generation_key(request)
+        self.status = "queued"  # queued, running, completed, cancelled, failed
+        self.events: List[Dict[str, Any]] = []
+        self.result: Dict[str, Any] = None
+        self.error: str = None
+        self.cancel_requested = threading.Event()
+        self._loop = loop
+        self._notify = asyncio.Event()
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """이벤트 추가 후 스트림 대기자를 깨움 (워커 스레드에서도 호출 가능)"""
+        self.events.append({"event": event, "data": data})
+        self._loop.call_soon_threadsafe(self._notify.set)
+
+    async def wait(self):
+        await self._notify.wait()
+        self._notify.clear()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "cancelled", "failed")
+
+    def summary(self) -> Dict[str, Any]:
+        progress = next((e["data"] for e in reversed(self.events) if e["event"] == "progress"), None)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+generation_jobs: Dict[str, GenerationJob] = {}
+
+def prepare_job_generator(request: TeamGenerationRequest) -> TeamGenerator:
+    """
+    작업용 생성기를 만든다. 최적화 상태는 작업마다 따로 두되, 공동 참여 데이터와 가중치는
+    전역 생성기(시작 시 워밍업된 캐시)에서 가져와 같은 히스토리 버전이면 다시 계산하지 않는다.
+    """
+    generator = TeamGenerator(team_history_file=TEAM_HISTORY_FILE, elite_cache=elite_cache)
+    version, history = history_store.snapshot()
+    with generator_lock:
+        team_generator.load_past_cooccurrence_from_records(
+            request.participants, history, version=version, aggregates=history_store.aggregates()
+        )
+        team_generator._get_time_decay_weights(request.participants)
+        generator.copy_loaded_state(team_generator)
+    return generator
+
+async def run_generation_job(job: GenerationJob):
+    """작업별 TeamGenerator로 최적화를 워커 스레드에서 실행하고 결과를 기록에 저장"""
+    job.status = "running"
+    job.publish("status", {"status": job.status})
+    try:
+        generator = await asyncio.to_thread(prepare_job_generator, job.request)
+        result = await asyncio.to_thread(
+            run_generation,
+            job.request,
+            generator,
+            lambda data: job.publish("progress", data),
+            job.cancel_requested.is_set
+        )
+
+        # 중단된 경우에도 그때까지의 최선 해를 결과로 사용
+        await save_team_history(
+            result["groups"], result["method_used"], job.request.lam, len(job.request.participants),
+            based_on_version=result.pop("history_version")
+        )
+        response = TeamGenerationResponse(**result).model_dump()
+    except ConstraintError as e:
+        fail_job(job, str(e))
+        return
+    except Exception as e:
+        # 저장/응답 생성 실패도 작업 실패로 알려야 스트림과 화면의 진행 표시가 끝남
+        fail_job(job, f"조 생성 중 오류가 발생했습니다: {str(e)}")
+        return
+
+    job.result = response
+    job.status = "cancelled" if result["optimization_stats"].get("cancelled") else "completed"
+    job.publish("result", {"status": job.status, **job.result})
+
+def fail_job(job: GenerationJob, detail: str):
+    job.status = "failed"
+    job.error = detail
+    job.publish("error", {"status": job.status, "detail": job.error})
+
+def get_job(job_id: str) -> GenerationJob:
+    job = generation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="조 생성 작업을 찾을 수 없습니다.")
+    return job
+
+jobs_idempotency = IdempotencyCache(IDEMPOTENCY_TTL)
+
+@app.post("/api/generate/jobs", status_code=202)
+async def submit_generation_job(
+    request: TeamGenerationRequest,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """조 생성 작업을 제출하고 작업 ID를 반환합니다. 진행 상황은 /events로 스트리밍됩니다.
+
+    같은 요청의 작업이 이미 진행 중이거나 같은 Idempotency-Key로 제출된 작업이 있으면
+    새 작업을 만들지 않고 그 작업 ID를 돌려줍니다.
+    """
+    key = generation_key(request)
+    existing = jobs_idempotency.get(idempotency_key, key) if idempotency_key else None
+    if existing is None:
+        existing = next((j for j in generation_jobs.values() if j.key == key and not j.finished), None)
+    if existing is not None and existing.id in generation_jobs and existing.status != "failed":
+        return {"job_id": existing.id, "status": existing.status}
+
+    # 오래된 완료 작업 정리
+    finished = [j for j in generation_jobs.values() if j.finished]
+    for old_job in finished[:max(0, len(generation_jobs) - MAX_JOBS + 1)]:
+        del generation_jobs[old_job.id]
+
+    job = GenerationJob(request, asyncio.get_running_loop())
+    generation_jobs[job.id] = job
+    if idempotency_key:
+        jobs_idempotency.put(idempotency_key, key, job)
+    asyncio.create_task(run_generation_job(job))
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/api/generate/jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """작업 상태, 마지막 진행 상황, (완료 시) 결과를 반환합니다."""
+    return get_job(job_id).summary()
+
+@app.get("/api/generate/jobs/{job_id}/events")
+async def stream_generation_job(job_id: str):
+    """작업 진행 이벤트를 Server-Sent Events로 스트리밍합니다.
+
+    이벤트 종류: status, progress(iteration, current_cost, best_cost, temperature), result, error
+    """
+    job = get_job(job_id)
+
+    async def event_stream():
+        sent = 0
+        while True:
+            while sent < len(job.events):
+                item = job.events[sent]
+                sent += 1
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'], ensure_ascii=False)}\n\n"
+            if job.finished and sent >= len(job.events):
+                break
+            await job.wait()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/api/generate/jobs/{job_id}")
+async def cancel_generation_job(job_id: str):
+    """작업을 조기 종료합니다. 그때까지 찾은 최선의 조 편성이 결과로 남습니다."""
+    job = get_job(job_id)
+    if not job.finished:
+        job.cancel_requested.set()
+    return {"job_id": job.id, "status": job.status, "cancel_requested": job.cancel_requested.is_set()}
+
+
+# 조 생성 기록 저장 함수
+async def save_team_history(
+    groups: List[List[str]],
+    method_used: str,
+    lambda_value: float,
+    participants_count: int,
+    based_on_version: Optional[str] = None
+):
+    """조 생성 기록을 저장합니다.
+
+    based_on_version은 결과를 만들 때 사용한 히스토리 버전으로, 저장 후 엘리트 캐시 항목을
+    새 버전으로 옮겨 같은 명단의 재생성이 계속 캐시를 사용할 수 있게 한다.
+    """
     # 현재 날짜와 시간
     from datetime import datetime
     current_time = datetime.now().isoformat()
     
-    # 새 기록 추가
-    history.append({
+    # 새 기록 추가 후 파일에 저장
+    history_store.append({
         "date": current_time,
         "groups": groups,
         "method_used": method_used,
         "lambda_value": lambda_value,
         "participants_count": participants_count
     })
-    
-    # 파일에 저장
-    with open(TEAM_HISTORY_FILE, "w", encoding='utf-8') as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+    if based_on_version is not None:
+        elite_cache.rekey_version(based_on_version, history_store.version())
+
+def count_cooccurrence_entries(record: Dict[str, Any]) -> int:
+    """기록 하나가 공동 참여 뷰에 기여하는 (순서 있는) 참가자 쌍 항목 수"""
+    return sum(len(group) * (len(group) - 1) for group in record.get("groups", []))
 
 @app.get("/api/team-history")
 async def get_team_history() -> TeamHistoryResponse:
     """조 생성 기록을 조회합니다."""
-    try:
-        with open(TEAM_HISTORY_FILE, "r", encoding='utf-8') as f:
-            history = json.load(f)
-        return {"history": history}
-    except (FileNotFoundError, json.JSONDecodeError):
+    if history_store.version() == "missing":
         ensure_file_exists(TEAM_HISTORY_FILE, [])
-        return {"history": []}
+    return {"history": history_store.load()}
 
 @app.delete("/api/team-history/{date}")
 async def delete_team_history(date: str):
     """특정 날짜의 조 생성 기록을 삭제합니다."""
-    try:
-        with open(TEAM_HISTORY_FILE, "r", encoding='utf-8') as f:
-            history = json.load(f)
-        
-        # 해당 날짜의 기록 필터링
-        filtered_history = [item for item in history if item["date"] != date]
-        
-        # 필터링된 기록 저장
-        with open(TEAM_HISTORY_FILE, "w", encoding='utf-8') as f:
-            json.dump(filtered_history, f, indent=2, ensure_ascii=False)
-        
-        # cooccurrence 데이터에서도 해당 날짜 데이터 삭제
-        try:
-            # 날짜 형식 변환 (ISO 8601 전체 → 날짜만)
-            try:
-                from datetime import datetime
-                parsed_date = datetime.fromisoformat(date).date().isoformat()
-            except ValueError:
-                # 이미 날짜 형식이거나 변환할 수 없는 경우
-                parsed_date = date
-            
-            print(f"[디버깅] 삭제 대상 날짜: {parsed_date}")
-            
-            # cooccurrence 데이터 로드
-            with open(COOCCURRENCE_FILE, "r", encoding='utf-8') as f:
-                cooccurrence_data = json.load(f)
-            
-            # 해당 날짜 데이터 삭제
-            modified_count = 0
-            for p in cooccurrence_data:
-                for q in list(cooccurrence_data.get(p, {}).keys()):
-                    if q in cooccurrence_data[p]:
-                        before_len = len(cooccurrence_data[p][q])
-                        cooccurrence_data[p][q] = [d for d in cooccurrence_data[p][q] if not d.startswith(parsed_date)]
-                        after_len = len(cooccurrence_data[p][q])
-                        modified_count += (before_len - after_len)
-            
-            print(f"[디버깅] 공동참여 데이터에서 {modified_count}개 항목 삭제됨")
-            
-            # 저장
-            with open(COOCCURRENCE_FILE, "w", encoding='utf-8') as f:
-                json.dump(cooccurrence_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"[디버깅] cooccurrence 데이터 삭제 중 오류: {str(e)}")
-        
-        return {"message": f"날짜 {date}의 조 생성 기록이 삭제되었습니다."}
-    except FileNotFoundError:
+    if history_store.version() == "missing":
         raise HTTPException(status_code=404, detail="조 생성 기록 파일이 없습니다.")
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="조 생성 기록 파일을 파싱할 수 없습니다.")
+
+    # 공동 참여 데이터는 히스토리에서 파생되므로 기록만 삭제하면 함께 반영됨
+    removed = history_store.delete_by_date(date)
+    print(f"[디버깅] 삭제 대상 날짜: {date}, 삭제된 기록 {len(removed)}건")
+    
+    return {"message": f"날짜 {date}의 조 생성 기록이 삭제되었습니다."}
 
 @app.delete("/api/team-history")
 async def delete_all_team_history():
     """모든 조 생성 기록을 삭제합니다."""
     try:
-        # 빈 기록으로 초기화
-        with open(TEAM_HISTORY_FILE, "w", encoding='utf-8') as f:
-            json.dump([], f, indent=2, ensure_ascii=False)
-        
-        # cooccurrence 데이터도 초기화
-        try:
-            # 현재 참가자 목록 가져오기
-            with open(PARTICIPANTS_FILE, "r", encoding='utf-8') as f:
-                participants = json.load(f)
-            
-            # 빈 구조 생성 (완전히 삭제하지 않고, 참가자는 유지한 채 기록만 삭제)
-            empty_cooccurrence = {}
-            for p in participants:
-                empty_cooccurrence[p] = {}
-                for q in participants:
-                    if p != q:
-                        empty_cooccurrence[p][q] = []
-            
-            with open(COOCCURRENCE_FILE, "w", encoding='utf-8') as f:
-                json.dump(empty_cooccurrence, f, indent=2, ensure_ascii=False)
-                
-            print(f"[디버깅] 모든 공동참여 데이터가 초기화되었습니다.")
-        except Exception as e:
-            print(f"[디버깅] cooccurrence 데이터 초기화 중 오류: {str(e)}")
-        
+        # 빈 기록으로 초기화 (압축된 집계와 공동 참여 데이터도 함께 초기화됨)
+        history_store.replace([], clear_aggregates=True)
         return {"message": "모든 조 생성 기록이 삭제되었습니다."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"조 생성 기록 삭제 중 오류가 발생했습니다: {str(e)}")
 
+@app.post("/api/team-history/compact")
+async def compact_team_history(horizon_days: int = 180):
+    """보존 기간(horizon_days)보다 오래된 기록을 쌍별 집계로 압축합니다.
+
+    압축된 기록은 기록 목록에서 사라지지만 만남 횟수와 시간 감쇠 최근성은 집계로 남아
+    가중치 계산 결과가 바뀌지 않습니다.
+    """
+    if horizon_days < 0:
+        raise HTTPException(status_code=400, detail="horizon_days는 0 이상이어야 합니다.")
+    compacted = await asyncio.to_thread(history_store.compact, horizon_days, team_generator.decay_rate)
+    return {
+        "message": f"{horizon_days}일보다 오래된 기록 {compacted}건을 압축했습니다.",
+        "compacted_records": compacted,
+        "remaining_records": len(history_store.load()),
+    }
+
 @app.delete("/api/today-data")
 async def delete_today_data() -> TodayDataDeleteResponse:
     """오늘 날짜의 가장 최근에 생성된 조 데이터를 삭제합니다."""
-    today_str = date.today().isoformat()
+    today = date.today()
+    today_str = today.isoformat()
     print(f"[디버깅] 오늘 날짜: {today_str}")
     
-    # 팀 히스토리에서 오늘 날짜의 가장 최근 데이터 삭제
-    deleted_history_item = None
-    try:
-        with open(TEAM_HISTORY_FILE, "r", encoding='utf-8') as f:
-            history = json.load(f)
-        
-        # 오늘 날짜 기록 찾기
-        today_history_items = []
-        other_history_items = []
-        
-        for item in history:
-            item_date = item["date"]
-            try:
-                # ISO 형식 날짜 변환
-                from datetime import datetime
-                parsed_date = datetime.fromisoformat(item_date).date().isoformat()
-                if parsed_date == today_str:
-                    today_history_items.append(item)
-                else:
-                    other_history_items.append(item)
-            except ValueError:
-                # 날짜 파싱 오류 시 항목 유지
-                other_history_items.append(item)
-        
-        # 오늘 데이터가 있으면 가장 최근 것 삭제
-        if today_history_items:
-            # 최신 순으로 정렬 (date 필드 기준)
-            today_history_items.sort(key=lambda x: x["date"], reverse=True)
-            # 첫 번째 항목(최신)을 삭제 대상으로 지정
-            deleted_history_item = today_history_items[0]
-            # 삭제 대상 제외하고 나머지 저장
-            filtered_history = other_history_items + today_history_items[1:]
-            
-            print(f"[디버깅] 팀 히스토리에서 가장 최근 생성된 항목 삭제: {deleted_history_item['date']}")
-        else:
-            filtered_history = other_history_items
-            print(f"[디버깅] 오늘 생성된 팀 히스토리 없음")
-        
-        # 필터링된 기록 저장
-        with open(TEAM_HISTORY_FILE, "w", encoding='utf-8') as f:
-            json.dump(filtered_history, f, indent=2, ensure_ascii=False)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"[디버깅] 팀 히스토리 파일 처리 중 오류: {str(e)}")
-    
-    # cooccurrence 데이터에서 오늘 데이터의 가장 최근 항목 삭제
+    # 날짜 인덱스에서 오늘의 가장 최근 기록을 찾아 삭제
+    deleted_history_item = history_store.delete_latest_on(today)
     deleted_cooccurrence_count = 0
-    
     if deleted_history_item:
-        try:
-            # 삭제된 팀 구성에서 참가자 추출
-            deleted_participants = set()
-            for group in deleted_history_item["groups"]:
-                for participant in group:
-                    deleted_participants.add(participant)
-            
-            with open(COOCCURRENCE_FILE, "r", encoding='utf-8') as f:
-                cooccurrence_data = json.load(f)
-            
-            # 삭제된 참가자들에 대해서만 오늘 날짜 데이터 중 가장 최근 항목 삭제
-            for p in deleted_participants:
-                if p not in cooccurrence_data:
-                    continue
-                    
-                for q in deleted_participants:
-                    if p == q or q not in cooccurrence_data[p]:
-                        continue
-                    
-                    # 오늘 날짜 데이터 찾기
-                    today_dates = [d for d in cooccurrence_data[p][q] if d == today_str]
-                    
-                    # 오늘 데이터가 있으면 가장 최근 항목(마지막 항목) 삭제
-                    if today_dates:
-                        before_len = len(cooccurrence_data[p][q])
-                        # 모든 오늘 날짜 데이터 제거
-                        other_dates = [d for d in cooccurrence_data[p][q] if d != today_str]
-                        
-                        # 마지막 항목 하나를 제외하고 다시 추가
-                        if len(today_dates) > 1:
-                            other_dates.extend(today_dates[:-1])
-                        
-                        cooccurrence_data[p][q] = other_dates
-                        after_len = len(cooccurrence_data[p][q])
-                        deleted_cooccurrence_count += (before_len - after_len)
-            
-            # 저장
-            with open(COOCCURRENCE_FILE, "w", encoding='utf-8') as f:
-                json.dump(cooccurrence_data, f, indent=2, ensure_ascii=False)
-                
-            print(f"[디버깅] 공동참여 데이터에서 {deleted_cooccurrence_count}개 항목 삭제됨")
-        except Exception as e:
-            print(f"[디버깅] cooccurrence 데이터 처리 중 오류: {str(e)}")
+        deleted_cooccurrence_count = count_cooccurrence_entries(deleted_history_item)
+        print(f"[디버깅] 팀 히스토리에서 가장 최근 생성된 항목 삭제: {deleted_history_item['date']}")
+    else:
+        print(f"[디버깅] 오늘 생성된 팀 히스토리 없음")
     
     return TodayDataDeleteResponse(
         message=f"오늘({today_str}) 날짜의 가장 최근에 생성된 조 데이터가 삭제되었습니다.",
@@ -478,48 +762,16 @@ async def delete_today_data() -> TodayDataDeleteResponse:
 @app.get("/api/has-today-data")
 async def check_today_data():
     """오늘 날짜에 생성된 팀 데이터가 있는지와 마지막 생성 시각을 반환합니다."""
-    today_str = date.today().isoformat()
-    has_today_data = False
-    latest_time_iso = None
+    latest = history_store.latest_on(date.today())
+    if latest is None:
+        return {"has_today_data": False}
 
-    # 공동참여 데이터로 존재 여부 확인
+    # 조에 두 명 이상이 있어야 공동 참여 데이터가 생김
+    record = latest[1]
+    response = {"has_today_data": count_cooccurrence_entries(record) > 0}
     try:
-        with open(COOCCURRENCE_FILE, "r", encoding='utf-8') as f:
-            data = json.load(f)
-        for person in data:
-            for other in data.get(person, {}):
-                dates = data[person][other]
-                if today_str in dates:
-                    has_today_data = True
-                    break
-            if has_today_data:
-                break
-    except FileNotFoundError:
-        has_today_data = False
-    except Exception as e:
-        return {"has_today_data": False, "error": str(e)}
-
-    # 팀 히스토리에서 오늘 마지막 생성 시각 조회
-    try:
-        with open(TEAM_HISTORY_FILE, "r", encoding='utf-8') as f:
-            history = json.load(f)
-        if isinstance(history, list) and history:
-            from datetime import datetime
-            today_items = []
-            for item in history:
-                try:
-                    dt = datetime.fromisoformat(item.get("date", ""))
-                    if dt.date().isoformat() == today_str:
-                        today_items.append(dt)
-                except Exception:
-                    continue
-            if today_items:
-                latest_dt = max(today_items)
-                latest_time_iso = latest_dt.isoformat()
-    except (FileNotFoundError, json.JSONDecodeError):
+        from datetime import datetime
+        response["latest_time"] = datetime.fromisoformat(record["date"]).isoformat()
+    except (KeyError, TypeError, ValueError):
         pass
-
-    response = {"has_today_data": has_today_data}
-    if latest_time_iso:
-        response["latest_time"] = latest_time_iso
-    return response
\ No newline at end of file
+    return response
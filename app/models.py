@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
 from typing import List, Dict, Optional, Literal, Any
 from datetime import date
 
@@ -17,18 +17,72 @@ class CooccurrenceInfo(BaseModel):
     time_decay_weight: float
     occurrence_dates: Optional[List[str]] = None
 
+# 방식별 탐색량 상한: 60명 기준으로 SA max_iter 상한(20000회, 약 0.7초)과 비슷한 시간이 되도록 잡음
+#  - 병렬 템퍼링: 복제본 이동 1회 약 8us -> 전체 이동 100000회 약 1초
+#  - 배치 어닐링: 후보 평가 약 0.5us -> 전체 후보 2000000개 약 1초
+MAX_PT_MOVES = 100_000
+MAX_BATCH_MOVES = 2_000_000
+
+class SAParams(BaseModel):
+    """sa_params로 받을 수 있는 최적화 파라미터와 허용 범위 (워커를 오래 붙잡지 않도록 상한을 둠)"""
+    model_config = ConfigDict(extra="forbid")
+
+    # 시뮬레이티드 어닐링 (SA_PARAM_KEYS)
+    initial_temp: Optional[float] = Field(default=None, gt=0, le=10000)
+    cooling_rate: Optional[float] = Field(default=None, gt=0, le=0.9999)
+    temp_min: Optional[float] = Field(default=None, gt=0, le=1000)
+    max_iter: Optional[int] = Field(default=None, ge=1, le=20000)
+    # 병렬 템퍼링 (PT_PARAM_KEYS)
+    n_replicas: Optional[int] = Field(default=None, ge=2, le=16)
+    rounds: Optional[int] = Field(default=None, ge=1, le=500)
+    steps_per_round: Optional[int] = Field(default=None, ge=1, le=2000)
+    workers: Optional[int] = Field(default=None, ge=1, le=32)
+    # 배치 어닐링 (BATCH_PARAM_KEYS)
+    batch_size: Optional[int] = Field(default=None, ge=1, le=4096)
+    batch_rule: Optional[Literal["metropolis", "best"]] = None
+
+    @model_validator(mode="after")
+    def check_search_budget(self) -> "SAParams":
+        """방식별 전체 탐색량 상한 (지정하지 않은 값은 생성기 기본값으로 계산)"""
+        pt_moves = (self.n_replicas or 8) * (self.rounds or 40) * (self.steps_per_round or 100)
+        if pt_moves > MAX_PT_MOVES:
+            raise ValueError(f"n_replicas x rounds x steps_per_round는 {MAX_PT_MOVES} 이하여야 합니다 (현재 {pt_moves})")
+        batch_moves = (self.max_iter or 1500) * (self.batch_size or 32)
+        if batch_moves > MAX_BATCH_MOVES:
+            raise ValueError(f"max_iter x batch_size는 {MAX_BATCH_MOVES} 이하여야 합니다 (현재 {batch_moves})")
+        return self
+
 class TeamGenerationRequest(BaseModel):
     participants: List[str]
     window_days: int = 60
     lam: float = 0.7
     method: str = "simulated_annealing"
-    sa_params: Dict[str, Any] = None
+    sa_params: Optional[Dict[str, Any]] = None
     accumulate_same_day: bool = False
+    # 반드시 같은 조가 되어야 하는 참가자 묶음 (예: 멘토-신입)
+    must_link: List[List[str]] = []
+    # 같은 조가 되면 안 되는 참가자 쌍
+    cannot_link: List[List[str]] = []
+    # 직전 결과를 거절하고 다시 생성: 캐시된 좋은 해에서 출발해 이미 보여준 결과와 다른 조 편성을 찾음
+    regenerate: bool = False
+
+    @field_validator("sa_params")
+    @classmethod
+    def validate_sa_params(cls, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """알 수 없는 키, 잘못된 타입, 범위를 벗어난 값은 422로 거부하고 지정된 값만 남김"""
+        if value is None:
+            return None
+        try:
+            return SAParams.model_validate(value).model_dump(exclude_none=True)
+        except ValidationError as e:
+            raise ValueError(f"sa_params가 올바르지 않습니다: {e}") from e
 
 class TeamGenerationResponse(BaseModel):
     groups: List[List[str]]
     cooccurrence_info: Dict[str, Dict[str, CooccurrenceInfo]]
     method_used: str
+    # 최적화 통계 (솔버 비용, 지역 탐색으로 제거한 비용 등)
+    optimization_stats: Optional[Dict[str, Any]] = None
 
 class AttendanceUpdate(BaseModel):
     name: str
@@ -51,4 +105,34 @@ class DeleteHistoryRequest(BaseModel):
 # 오늘 데이터 삭제 응답 모델
 class TodayDataDeleteResponse(BaseModel):
     message: str
-    stats: Dict[str, int] 
\ No newline at end of file
+    stats: Dict[str, int] 
+
+# 공정성 분석 응답 모델
+class ParticipantFairness(BaseModel):
+    sessions_attended: int
+    total_meetings: int
+    partners_met: int
+    partners_not_met: int
+    max_repeat: int
+
+class FairnessSummary(BaseModel):
+    participants: int
+    total_pairs: int
+    pairs_met: int
+    pairs_not_met: int
+    met_fraction: float
+    max_repeat: int
+    meeting_distribution: List[int]
+    partners_met_mean: float
+    partners_met_std: float
+
+class SessionCost(BaseModel):
+    date: str
+    cost: float
+
+class FairnessResponse(BaseModel):
+    summary: FairnessSummary
+    participants: Dict[str, ParticipantFairness]
+    unmet_pairs: List[List[str]]
+    session_costs: List[SessionCost]
+    history_version: str
@@ -0,0 +1,185 @@
+"""
+장기 시뮬레이션 도구 (규모 계획용).
+
+가상의 참가자 명단과 출석 모델로 S개의 세션을 연속 생성하면서, 각 세션의 결과를
+메모리 안의 기록에 바로 추가해 다음 세션의 입력으로 사용한다 (파일 I/O 없음).
+세션마다 공정성 지표(모든 쌍이 만난 비율, 반복 쌍 비율)와 생성 시간을 기록하므로
+"모두가 모두를 만나는 데 몇 주가 걸리는지"와 생성기 실행 시간의 증가 추세를 볼 수 있다.
+
+사용 예:
+    python -m app.simulation --participants 40 --sessions 52 --attendance 0.8 --seeds 8 --workers 4
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from .team_generator import TeamGenerator
+
+
+def simulate(
+    num_participants: int,
+    num_sessions: int,
+    attendance: float = 0.8,
+    attendance_spread: float = 0.1,
+    lam: float = 0.7,
+    sa_params: Optional[Dict[str, Any]] = None,
+    seed: int = 0,
+    start_date: str = "2025-01-06T19:00:00"
+) -> Dict[str, Any]:
+    """
+    하나의 시드로 num_sessions개의 주간 세션을 연속 생성한다.
+
+    출석 모델: 참가자마다 [attendance - spread, attendance + spread] 범위의 출석 성향을 두고
+    매 세션 그 확률로 독립적으로 출석한다.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    roster = [f"P{i:03d}" for i in range(num_participants)]
+    propensity = {
+        p: min(1.0, max(0.0, rng.uniform(attendance - attendance_spread, attendance + attendance_spread)))
+        for p in roster
+    }
+
+    generator = TeamGenerator()
+    history: List[Dict[str, Any]] = []
+    met_pairs = set()
+    total_pairs = num_participants * (num_participants - 1) // 2
+    start = datetime.fromisoformat(start_date)
+
+    curve = []
+    weeks_to_full = None
+    for s in range(num_sessions):
+        session_dt = (start + timedelta(weeks=s)).isoformat()
+        attendees = [p for p in roster if rng.random() < propensity[p]]
+        # 4명/5명 조로 나눌 수 없는 인원(1~3, 6, 7, 11명)인 세션은 건너뜀
+        if not TeamGenerator.can_partition(len(attendees)):
+            curve.append({"session": s + 1, "attendees": len(attendees), "skipped": True})
+            continue
+
+        # 생성기 내부의 디버깅 출력은 시뮬레이션 중에는 숨김
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            generator.load_past_cooccurrence_from_records(attendees, history, as_of_iso=session_dt)
+            groups = generator.generate_groups(attendees, lam, sa_params=sa_params)
+            latency = time.perf_counter() - t0
+
+        in_group_pairs = 0
+        repeated = 0
+        max_repeat = 0
+        for group in groups:
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    count = generator.meeting_count(group[i], group[j])
+                    in_group_pairs += 1
+                    if count:
+                        repeated += 1
+                        max_repeat = max(max_repeat, count)
+                    met_pairs.add(frozenset((group[i], group[j])))
+
+        # 결과를 메모리 기록에 바로 반영 (다음 세션의 과거 데이터가 됨)
+        history.append({
+            "date": session_dt,
+            "groups": groups,
+            "method_used": "simulation",
+            "lambda_value": lam,
+            "participants_count": len(attendees),
+        })
+
+        coverage = len(met_pairs) / total_pairs if total_pairs else 1.0
+        if weeks_to_full is None and len(met_pairs) == total_pairs:
+            weeks_to_full = s + 1
+        curve.append({
+            "session": s + 1,
+            "attendees": len(attendees),
+            "latency": latency,
+            "met_fraction": coverage,
+            "repeat_pair_rate": repeated / in_group_pairs if in_group_pairs else 0.0,
+            "max_repeat": max_repeat,
+            "final_cost": generator.last_stats.get("final_cost"),
+        })
+
+    return {"seed": seed, "weeks_to_full_coverage": weeks_to_full, "curve": curve}
+
+
+def _simulate_task(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return simulate(**kwargs)
+
+
+def summarize(runs: List[Dict[str, Any]], num_sessions: int) -> Dict[str, Any]:
+    """여러 시드의 결과를 세션별 평균 곡선으로 요약"""
+    curve = []
+    for s in range(num_sessions):
+        points = [r["curve"][s] for r in runs if s < len(r["curve"]) and not r["curve"][s].get("skipped")]
+        if not points:
+            continue
+        curve.append({
+            "session": s + 1,
+            "met_fraction": sum(p["met_fraction"] for p in points) / len(points),
+            "repeat_pair_rate": sum(p["repeat_pair_rate"] for p in points) / len(points),
+            "latency_mean": sum(p["latency"] for p in points) / len(points),
+            "latency_max": max(p["latency"] for p in points),
+        })
+    weeks = [r["weeks_to_full_coverage"] for r in runs]
+    reached = [w for w in weeks if w is not None]
+    return {
+        "weeks_to_full_coverage": weeks,
+        "weeks_to_full_coverage_mean": sum(reached) / len(reached) if reached else None,
+        "seeds_not_reached": len(weeks) - len(reached),
+        "curve": curve,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="TeamGenerator 장기 시뮬레이션")
+    parser.add_argument("--participants", type=int, default=40, help="전체 참가자 수")
+    parser.add_argument("--sessions", type=int, default=52, help="연속 생성할 세션 수 (주 단위)")
+    parser.add_argument("--attendance", type=float, default=0.8, help="평균 출석 확률")
+    parser.add_argument("--attendance-spread", type=float, default=0.1, help="참가자별 출석 성향 편차")
+    parser.add_argument("--lam", type=float, default=0.7, help="비용 변환 람다")
+    parser.add_argument("--max-iter", type=int, default=None, help="SA 최대 반복 수")
+    parser.add_argument("--seeds", type=int, default=4, help="시드 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="병렬 워커 프로세스 수")
+    parser.add_argument("--output", default="data/simulation.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    sa_params = {"max_iter": args.max_iter} if args.max_iter else None
+    tasks = [
+        {
+            "num_participants": args.participants,
+            "num_sessions": args.sessions,
+            "attendance": args.attendance,
+            "attendance_spread": args.attendance_spread,
+            "lam": args.lam,
+            "sa_params": sa_params,
+            "seed": seed,
+        }
+        for seed in range(args.seeds)
+    ]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        runs = list(pool.map(_simulate_task, tasks))
+
+    report = {"config": vars(args), "summary": summarize(runs, args.sessions), "runs": runs}
+    report["elapsed"] = time.perf_counter() - start
+    with open(args.output, "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    summary = report["summary"]
+    print(f"모두가 모두를 만나기까지 걸린 주: {summary['weeks_to_full_coverage']}")
+    if summary["curve"]:
+        last = summary["curve"][-1]
+        print(f"마지막 세션: 만난 쌍 비율 {last['met_fraction']:.3f}, "
+              f"평균 생성 시간 {last['latency_mean'] * 1000:.1f}ms")
+    print(f"결과를 {args.output}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,149 @@
 import random
 import math
 import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta, datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Any, Callable
+
+import numpy as np
+
+# 제약 조건을 만족하는 이웃 해를 찾기 위한 최대 샘플링 횟수
+_MAX_MOVE_ATTEMPTS = 50
+# 제약 조건 초기 배치 탐색(백트래킹)의 노드 예산 및 재시작 횟수
+_CONSTRAINT_SEARCH_BUDGET = 20000
+_CONSTRAINT_SEARCH_RESTARTS = 5
+# 지역 탐색에서 개선으로 인정할 최소 비용 감소량 (부동소수점 오차 방지)
+_IMPROVEMENT_EPS = 1e-9
+# 시뮬레이티드 어닐링에서 요청으로 덮어쓸 수 있는 파라미터
+SA_PARAM_KEYS = ("initial_temp", "cooling_rate", "temp_min", "max_iter")
+# 병렬 템퍼링에서 요청으로 덮어쓸 수 있는 파라미터
+PT_PARAM_KEYS = ("n_replicas", "rounds", "steps_per_round", "workers")
+# 배치 어닐링에서 SA 파라미터에 더해 덮어쓸 수 있는 파라미터
+BATCH_PARAM_KEYS = ("batch_size", "batch_rule")
+# 진행 상황 콜백 호출 간격 (SA 반복 횟수)
+PROGRESS_EVERY = 50
+# 재생성(regenerate) 시 SA 설정: 좋은 해에서 출발하므로 시작 온도 상한을 낮추고 반복 수를 나눔
+REGENERATE_MAX_TEMP = 1.0
+REGENERATE_ITER_DIVISOR = 4
+# 재생성 시 이미 보여준 해에서 같은 조였던 쌍의 가중치에 더하는 페널티 (보여준 횟수당)
+DIVERSITY_PENALTY = 0.2
+
+# 진행 상황 콜백: {"iteration", "current_cost", "best_cost", "temperature"} 딕셔너리를 받음
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class ConstraintError(ValueError):
+    """must-link / cannot-link 제약 조건이나 인원수 때문에 조 편성이 불가능할 때 발생"""
+
+
+class _PairingMasks:
+    """must-link / cannot-link 제약을 참가자 인덱스 기반 마스크로 컴파일한 결과.
+
+    - units: must-link로 묶여 항상 함께 움직이는 참가자 단위 목록
+    - unit_of: 참가자 이름 -> 소속 단위 인덱스
+    - conflict: 참가자 인덱스별로 같은 조가 될 수 없는 참가자들의 비트마스크
+    """
+
+    def __init__(self, participants: List[str], units: List[List[str]], conflict: List[int]):
+        self.index = {p: i for i, p in enumerate(participants)}
+        self.units = units
+        self.unit_of = {p: u for u, members in enumerate(units) for p in members}
+        self.conflict = conflict
+        self.has_links = any(len(u) > 1 for u in units)
+
+    def mask(self, members: List[str]) -> int:
+        """참가자 목록을 인덱스 비트마스크로 변환"""
+        m = 0
+        for p in members:
+            m |= 1 << self.index[p]
+        return m
+
+    def conflict_mask(self, members: List[str]) -> int:
+        """참가자 목록과 같은 조가 될 수 없는 참가자들의 비트마스크"""
+        m = 0
+        for p in members:
+            m |= self.conflict[self.index[p]]
+        return m
+
+    def compatible(self, members: List[str], others: List[str]) -> bool:
+        """members를 others와 같은 조에 넣어도 cannot-link 제약을 위반하지 않는지 확인"""
+        return not (self.conflict_mask(members) & self.mask(others))
+
+
+class EliteCache:
+    """
+    (참가자 명단, 히스토리 버전, lam, 제약 조건)별로 가장 좋았던 조 편성 몇 개와
+    이미 사용자에게 보여준 조 편성을 보관한다. 여러 TeamGenerator 인스턴스가 공유할 수 있다.
+
+    재생성 요청은 여기 저장된 엘리트 해를 섞어서 출발점으로 쓰고, 보여준 해에서 같은 조였던
+    쌍에는 페널티를 줘서 다른 결과를 찾는다.
+    """
+
+    def __init__(self, max_keys: int = 16, max_elites: int = 5, max_shown: int = 10):
+        self.max_keys = max_keys
+        self.max_elites = max_elites
+        self.max_shown = max_shown
+        self._lock = threading.Lock()
+        # key -> {"elites": [(비용, 조 편성)], "shown": [조 편성]}
+        self._entries: "OrderedDict[tuple, Dict[str, List]]" = OrderedDict()
+
+    @staticmethod
+    def canonical(groups: List[List[str]]) -> frozenset:
+        """조 순서와 조 안의 순서를 무시한 조 편성 표현"""
+        return frozenset(frozenset(g) for g in groups)
+
+    def _entry(self, key: tuple) -> Dict[str, List]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"elites": [], "shown": []}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return entry
+
+    def record(self, key: tuple, groups: List[List[str]], cost: float) -> None:
+        """결과를 엘리트 후보로 추가하고 보여준 해로 표시"""
+        with self._lock:
+            entry = self._entry(key)
+            canon = self.canonical(groups)
+            if all(self.canonical(g) != canon for _, g in entry["elites"]):
+                entry["elites"].append((cost, [list(g) for g in groups]))
+                entry["elites"].sort(key=lambda item: item[0])
+                del entry["elites"][self.max_elites:]
+            entry["shown"].append([list(g) for g in groups])
+            del entry["shown"][:-self.max_shown]
+
+    def get(self, key: tuple) -> Tuple[List[List[List[str]]], List[List[List[str]]]]:
+        """(엘리트 조 편성 목록(비용 오름차순), 보여준 조 편성 목록)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return [], []
+            return [g for _, g in entry["elites"]], list(entry["shown"])
+
+    def rekey_version(self, old_version: str, new_version: str) -> None:
+        """
+        결과를 히스토리에 저장해 버전이 바뀌었을 때 그 버전의 항목을 새 버전으로 옮긴다.
+        (새 버전은 이전 버전 + 보여준 해이므로 같은 명단의 재생성에서 계속 사용할 수 있음)
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == old_version]:
+                self._entries[(key[0], new_version) + key[2:]] = self._entries.pop(key)
+
 
 class TeamGenerator:
-    def __init__(self, team_history_file: str = "data/team_history.json"):
+    def __init__(self, team_history_file: str = "data/team_history.json", elite_cache: Optional[EliteCache] = None):
         self.team_history_file = team_history_file
+        # 재생성용 엘리트 해 캐시 (여러 생성기가 공유하도록 외부에서 넘길 수 있음)
+        self.elite_cache = elite_cache if elite_cache is not None else EliteCache()
         self.past_dates: Dict[str, Dict[str, List[str]]] = {}
+        # 압축된 오래된 기록의 쌍별 집계: p -> q -> (만남 횟수, 기준 주차 시점의 감쇠 최근성 합, 마지막 날짜)
+        self.past_aggregates: Dict[str, Dict[str, Tuple[int, float, str]]] = {}
+        self.aggregate_anchor_date: Optional[str] = None  # 집계의 기준 날짜 (이 날짜 이전 기록만 압축됨)
         self.base_date: date = None  # 기준 날짜 (Week 1)
         self.current_date: date = None  # 현재 주차 계산에 사용할 기준 날짜 (None이면 today)
         
@@ -19,6 +155,14 @@ class TeamGenerator:
         self.first_meeting_bonus = -0.6  # 첫 만남 보너스 (음수 = 선호)
         self.base_penalty = 3.0      # 기본 페널티
 
+        # 마지막 generate_groups 실행의 최적화 통계 (API 응답에 포함)
+        self.last_stats: Dict[str, Any] = {}
+
+        # 같은 히스토리 버전/참가자로 다시 로드할 때 재계산을 건너뛰기 위한 캐시 키와 가중치 캐시
+        self._loaded_key: Optional[tuple] = None
+        self._loaded_participants: frozenset = frozenset()
+        self._weights_cache: Optional[Tuple[tuple, Dict[str, Dict[str, float]]]] = None
+
     def load_past_cooccurrence_from_history(self, participants: List[str], as_of_iso: str = None) -> None:
         """Load past co-occurrence data from team history with time decay consideration.
 
@@ -27,6 +171,11 @@ class TeamGenerator:
             as_of_iso: ISO 형식 날짜/시간 문자열. 주어지면 해당 시점까지의 기록만 사용하며,
                       현재 주차 계산의 기준 날짜도 이 값으로 설정함
         """
+        history = self.read_history()
+        self.load_past_cooccurrence_from_records(participants, history, as_of_iso=as_of_iso)
+
+    def read_history(self) -> List[Dict[str, Any]]:
+        """팀 히스토리 파일을 읽어 기록 목록을 반환 (없거나 손상되면 빈 목록)"""
         try:
             with open(self.team_history_file, "r", encoding='utf-8') as f:
                 history = json.load(f)
@@ -38,6 +187,35 @@ class TeamGenerator:
         except json.JSONDecodeError:
             print(f"[디버깅] JSON 파싱 오류: {self.team_history_file}")
             history = []
+        return history
+
+    def load_past_cooccurrence_from_records(
+        self,
+        participants: List[str],
+        history: List[Dict[str, Any]],
+        as_of_iso: str = None,
+        version: str = None,
+        aggregates: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """이미 메모리에 있는 기록 목록으로 공동 참여 데이터를 구성 (파일 I/O 없음).
+
+        튜닝/시뮬레이션처럼 기록을 반복 재생하는 도구에서 사용하며, 파라미터 의미는
+        load_past_cooccurrence_from_history와 같다. version(히스토리 버전)이 주어지고
+        직전 로드와 버전/참가자/기준 시점이 모두 같으면 다시 계산하지 않는다.
+
+        aggregates는 app.compaction으로 압축된 오래된 기록의 쌍별 집계이며, 기준 날짜
+        (anchor_date) 이후 시점의 가중치 계산에만 반영된다. as-of가 기준 날짜보다 이르면
+        압축된 기록을 시점별로 나눌 수 없으므로 집계를 사용하지 않는다.
+        """
+        load_key = None
+        if version is not None:
+            load_key = (version, as_of_iso, date.today())
+            # 이미 로드된 참가자 집합이 요청 참가자를 모두 포함하면 그대로 사용 가능
+            if load_key == self._loaded_key and self._loaded_participants.issuperset(participants):
+                print(f"[디버깅] 공동 참여 데이터 캐시 사용 (버전 {version})")
+                return
+        self._loaded_key = None
+        self._weights_cache = None
 
         # as-of 필터 적용 및 현재 기준 날짜 설정
         as_of_date = None
@@ -81,12 +259,23 @@ class TeamGenerator:
             self.current_date = date.today()
             print(f"[디버깅] as-of 미지정: 현재 날짜 {self.current_date} 기준")
 
-        # 기준 날짜 설정 (가장 오래된 기록을 Week 1로)
-        if history_filtered:
+        # 압축 집계는 기준 날짜 이후 시점에서만 사용
+        if aggregates and aggregates.get("pairs"):
+            anchor = datetime.fromisoformat(aggregates["anchor_date"]).date()
+            if self.current_date < anchor:
+                print(f"[디버깅] as-of({self.current_date})가 압축 기준 날짜({anchor})보다 이르므로 집계 미사용")
+                aggregates = None
+        else:
+            aggregates = None
+
+        # 기준 날짜 설정 (가장 오래된 기록을 Week 1로, 압축된 기록이 있으면 그 시작 날짜 포함)
+        if history_filtered or aggregates:
             dates = []
             for record in history_filtered:
                 record_date_str = record['date'][:10]
                 dates.append(datetime.fromisoformat(record_date_str).date())
+            if aggregates:
+                dates.append(datetime.fromisoformat(aggregates["base_date"]).date())
             dates.sort()
             self.base_date = dates[0]
             print(f"[디버깅] 기준 날짜 설정 (Week 1): {self.base_date}")
@@ -120,8 +309,45 @@ class TeamGenerator:
                 print(f"[디버깅] 기록 처리 중 오류: {e}")
                 continue
 
+        # 압축된 쌍별 집계 반영
+        self.past_aggregates = {}
+        self.aggregate_anchor_date = None
+        if aggregates:
+            self.aggregate_anchor_date = aggregates["anchor_date"]
+            present = set(participants)
+            if aggregates.get("decay_rate") not in (None, self.decay_rate):
+                print(f"[디버깅] 압축 당시 감쇠율({aggregates['decay_rate']})이 현재와 달라 최근성이 근사값이 됨")
+            for a, b, count, recency, last in aggregates["pairs"]:
+                if a in present and b in present:
+                    self.past_aggregates.setdefault(a, {})[b] = (count, recency, last)
+                    self.past_aggregates.setdefault(b, {})[a] = (count, recency, last)
+            print(f"[디버깅] 압축 집계 반영: {aggregates.get('compacted_records', 0)}건 (기준 {self.aggregate_anchor_date})")
+
         print(f"[디버깅] 처리된 기록 수: {valid_records}")
         print(f"[디버깅] 생성된 공동 참여 데이터 참가자 수: {len(self.past_dates)}")
+        self._loaded_key = load_key
+        self._loaded_participants = frozenset(participants)
+
+    def copy_loaded_state(self, other: "TeamGenerator") -> None:
+        """
+        다른 생성기가 로드해 둔 공동 참여 데이터와 가중치 캐시를 가져온다.
+
+        로드할 때마다 새 딕셔너리를 만들고 기존 것을 수정하지 않으므로 참조를 공유해도 안전하다.
+        최적화 상태(last_stats 등)는 공유하지 않는다.
+        """
+        self.past_dates = other.past_dates
+        self.past_aggregates = other.past_aggregates
+        self.aggregate_anchor_date = other.aggregate_anchor_date
+        self.base_date = other.base_date
+        self.current_date = other.current_date
+        self._loaded_key = other._loaded_key
+        self._loaded_participants = other._loaded_participants
+        self._weights_cache = other._weights_cache
+
+    def meeting_count(self, p1: str, p2: str) -> int:
+        """두 참가자가 만난 횟수 (압축된 집계 포함)"""
+        aggregate = self.past_aggregates.get(p1, {}).get(p2)
+        return len(self.past_dates.get(p1, {}).get(p2, [])) + (aggregate[0] if aggregate else 0)
 
     def _get_current_week(self) -> int:
         """현재 주차를 계산 (기준 날짜로부터)"""
@@ -142,8 +368,9 @@ class TeamGenerator:
     def _calculate_time_decay_weight(self, p1: str, p2: str) -> float:
         """시간 감쇠를 적용한 가중치 계산"""
         dates = self.past_dates.get(p1, {}).get(p2, [])
+        aggregate = self.past_aggregates.get(p1, {}).get(p2)
         
-        if not dates:
+        if not dates and aggregate is None:
             # 한 번도 만난 적 없음 → 첫 만남 보너스
             return self.first_meeting_bonus
         
@@ -151,11 +378,16 @@ class TeamGenerator:
         
         # 빈도 점수: 총 만난 횟수가 많을수록 페널티가 커지도록 단조 증가형으로 조정
         #  - 0회: 0, 1회: ~0.503, 5회: ~0.969 (k=0.7)
-        total_meetings = len(dates)
+        total_meetings = len(dates) + (aggregate[0] if aggregate else 0)
         frequency_score = 1 - math.exp(-0.7 * total_meetings)
         
         # 최근성 점수: 모든 만남을 시간감쇠로 합산 후 단조 증가형으로 변환
         recency_sum = 0.0
+        if aggregate:
+            # 압축된 만남: 기준 주차 시점의 감쇠 합을 현재 주차까지 추가 감쇠
+            # (decay^(현재-d) = decay^(현재-기준) * decay^(기준-d) 이므로 감쇠율이 같으면 정확히 일치)
+            weeks_since_anchor = max(current_week - self._get_week_from_date(self.aggregate_anchor_date), 0)
+            recency_sum += aggregate[1] * (self.decay_rate ** weeks_since_anchor)
         for d in dates:
             d_week = self._get_week_from_date(d)
             weeks_ago_d = current_week - d_week
@@ -183,8 +415,13 @@ class TeamGenerator:
                     continue
                     
                 dates = self.past_dates.get(p, {}).get(q, [])
-                count = len(dates)
+                aggregate = self.past_aggregates.get(p, {}).get(q)
+                count = self.meeting_count(p, q)
                 last_occurrence = max(dates) if dates else None
+                if aggregate:
+                    # 압축된 만남은 횟수와 마지막 날짜만 남아 있음 (occurrence_dates에는 포함되지 않음)
+                    if last_occurrence is None or aggregate[2] > last_occurrence:
+                        last_occurrence = aggregate[2]
                 
                 # 시간 감쇠 적용 가중치 계산
                 weight = self._calculate_time_decay_weight(p, q)
@@ -207,24 +444,189 @@ class TeamGenerator:
                 }
         return info
 
-    def generate_groups(self, participants: List[str], lam: float = 3.0) -> List[List[str]]:
+    def generate_groups(
+        self,
+        participants: List[str],
+        lam: float = 3.0,
+        must_link: Optional[List[List[str]]] = None,
+        cannot_link: Optional[List[List[str]]] = None,
+        sa_params: Optional[Dict[str, Any]] = None,
+        polish: bool = True,
+        method: str = "simulated_annealing",
+        progress_callback: Optional[ProgressCallback] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        regenerate: bool = False
+    ) -> List[List[str]]:
         """
         Generate optimized groups using simulated annealing with time decay weights.
+
+        must_link / cannot_link 제약이 주어지면 최적화 전에 인덱스 마스크로 컴파일하고
+        실행 가능한 초기 배치를 먼저 찾는다. 불가능한 제약이면 ConstraintError를 발생시킨다.
+        polish가 True이면 어떤 방식으로 만든 결과든 지역 탐색으로 마무리 개선한다.
+        method가 "parallel_tempering"이면 시뮬레이티드 어닐링 대신 병렬 템퍼링을,
+        "batched_annealing"이면 한 단계에 여러 교환 후보를 NumPy로 평가하는 배치 어닐링을 사용한다.
+        progress_callback은 최적화 도중 주기적으로 호출되며, should_stop이 True를 반환하면
+        최적화를 조기 종료하고 그때까지의 최선 해를 (지역 탐색 없이) 반환한다.
+
+        regenerate가 True이고 같은 명단/히스토리 버전/lam/제약의 엘리트 해가 elite_cache에 있으면,
+        엘리트 해를 조금 섞은 배치에서 낮은 온도(REGENERATE_MAX_TEMP 이하)와 1/REGENERATE_ITER_DIVISOR
+        반복(병렬 템퍼링은 라운드)으로 출발한다. 이미 보여준 해에서 같은 조였던 쌍의 가중치에는
+        DIVERSITY_PENALTY를 더해 최적화하고, 결과가 보여준 해와 같으면 이웃 해로 옮겨 항상 다른
+        결과를 반환한다. 완료된 결과는 모두 엘리트 캐시에 기록된다.
         """
-        # 참가자 수가 너무 적으면 기존 방식으로 처리
-        if len(participants) < 8:
-            return self._generate_groups_weighted_random(participants, lam)
-            
+        self.last_stats = {}
+        if not self.can_partition(len(participants)):
+            raise ConstraintError(f"{len(participants)}명은 4명/5명 조로 나눌 수 없습니다.")
+        masks = self._compile_constraints(participants, must_link, cannot_link)
+        initial = None
+        if masks is not None:
+            # 최적화에 들어가기 전에 제약 조건의 실행 가능성을 먼저 확인
+            initial = self._constrained_initial_partition(participants, masks)
+
         # 시간 감쇠 기반 가중치 딕셔너리 생성
         time_decay_weights = self._get_time_decay_weights(participants)
-        
-        # 시뮬레이티드 어닐링 알고리즘으로 최적화
-        return self._simulated_annealing(participants, time_decay_weights, lam)
 
-    def _generate_groups_weighted_random(self, participants: List[str], lam: float = 3.0) -> List[List[str]]:
+        # 재생성: 엘리트 해에서 출발하고, 보여준 해와 겹치는 쌍에 페널티를 준 가중치로 최적화
+        elite_key = self._elite_key(participants, lam, must_link, cannot_link)
+        search_weights = time_decay_weights
+        shown: List[List[List[str]]] = []
+        if regenerate:
+            elites, shown = self.elite_cache.get(elite_key)
+            # 8명 미만은 가중 랜덤 배정이라 출발점과 페널티 가중치를 쓰지 않음 (보여준 해와 다르게만 함)
+            warm_start = bool(elites) and len(participants) >= 8
+            if warm_start:
+                initial = self._perturb_partition(random.choice(elites), masks, max(2, len(participants) // 8))
+                search_weights = self._diversity_weights(time_decay_weights, shown)
+                sa_params = dict(sa_params or {})
+                sa_params["initial_temp"] = min(sa_params.get("initial_temp", 100.0), REGENERATE_MAX_TEMP)
+                sa_params["max_iter"] = max(1, sa_params.get("max_iter", 1500) // REGENERATE_ITER_DIVISOR)
+                # 병렬 템퍼링은 max_iter 대신 라운드 수로 탐색량이 정해지므로 같은 비율로 줄임
+                sa_params["rounds"] = max(1, sa_params.get("rounds", 40) // REGENERATE_ITER_DIVISOR)
+                print(f"[디버깅] 재생성: 엘리트 해 {len(elites)}개 중 하나에서 출발 (보여준 해 {len(shown)}개)")
+            self.last_stats["warm_start"] = warm_start
+
+        # 참가자 수가 너무 적으면 기존 방식으로 처리
+        if len(participants) < 8:
+            groups = self._generate_groups_weighted_random(participants, lam, masks=masks, fallback=initial)
+        elif method == "parallel_tempering":
+            # 온도별 복제본을 여러 프로세스에서 돌리고 주기적으로 교환
+            params = {k: v for k, v in (sa_params or {}).items() if k in PT_PARAM_KEYS}
+            groups = self._parallel_tempering(
+                participants, search_weights, lam, masks=masks, initial=initial,
+                progress_callback=progress_callback, should_stop=should_stop, **params
+            )
+        elif method == "batched_annealing":
+            # 교환 후보 batch_size개를 한 번에 평가하는 시뮬레이티드 어닐링
+            params = {k: v for k, v in (sa_params or {}).items() if k in SA_PARAM_KEYS + BATCH_PARAM_KEYS}
+            groups = self._batched_annealing(
+                participants, search_weights, lam, masks=masks, initial=initial,
+                progress_callback=progress_callback, should_stop=should_stop, **params
+            )
+        else:
+            # 시뮬레이티드 어닐링 알고리즘으로 최적화
+            params = {k: v for k, v in (sa_params or {}).items() if k in SA_PARAM_KEYS}
+            groups = self._simulated_annealing(
+                participants, search_weights, lam, masks=masks, initial=initial,
+                progress_callback=progress_callback, should_stop=should_stop, **params
+            )
+
+        cancelled = bool(should_stop and should_stop())
+        self.last_stats["cancelled"] = cancelled
+        self.last_stats["solver_cost"] = self._total_cost(groups, time_decay_weights, lam)
+        if polish and not cancelled:
+            pair_costs = self._pair_costs(participants, search_weights, lam)
+            groups, _ = self._local_search(groups, pair_costs, masks)
+            # 재생성 시에는 페널티 가중치로 탐색하므로, 제거한 비용은 실제 가중치 기준으로 보고
+            self.last_stats["polish_cost_removed"] = (
+                self.last_stats["solver_cost"] - self._total_cost(groups, time_decay_weights, lam)
+            )
+
+        # 재생성 결과가 이미 보여준 해와 같으면 이웃 해로 이동 (조가 하나뿐이면 다른 편성이 없음)
+        shown_set = {EliteCache.canonical(g) for g in shown}
+        for _ in range(_MAX_MOVE_ATTEMPTS):
+            if len(groups) < 2 or EliteCache.canonical(groups) not in shown_set:
+                break
+            groups, _ = self._neighbor_partition(groups, masks)
+
+        self.last_stats["final_cost"] = self._total_cost(groups, time_decay_weights, lam)
+        if not cancelled:
+            self.elite_cache.record(elite_key, groups, self.last_stats["final_cost"])
+        return groups
+
+    def _elite_key(
+        self,
+        participants: List[str],
+        lam: float,
+        must_link: Optional[List[List[str]]],
+        cannot_link: Optional[List[List[str]]]
+    ) -> tuple:
+        """엘리트 캐시 키: (참가자 명단, 로드한 히스토리 버전, lam, 제약 조건)"""
+        version = self._loaded_key[0] if self._loaded_key else None
+        constraints = (
+            tuple(sorted(tuple(sorted(g)) for g in (must_link or []))),
+            tuple(sorted(tuple(sorted(pair)) for pair in (cannot_link or []))),
+        )
+        return (tuple(sorted(participants)), version, lam, constraints)
+
+    def _perturb_partition(
+        self,
+        groups: List[List[str]],
+        masks: Optional[_PairingMasks],
+        moves: int
+    ) -> List[List[str]]:
+        """무작위 이웃 이동을 moves번 적용한 배치 (제약 조건 유지)"""
+        current = [list(g) for g in groups]
+        for _ in range(moves):
+            current, _ = self._neighbor_partition(current, masks)
+        return current
+
+    @staticmethod
+    def _diversity_weights(
+        weights: Dict[str, Dict[str, float]],
+        shown: List[List[List[str]]]
+    ) -> Dict[str, Dict[str, float]]:
+        """보여준 해에서 같은 조였던 쌍의 가중치에 (횟수 x DIVERSITY_PENALTY)를 더한 복사본"""
+        penalized = {p: dict(row) for p, row in weights.items()}
+        for groups in shown:
+            for group in groups:
+                for p in group:
+                    for q in group:
+                        if p != q and q in penalized.get(p, {}):
+                            penalized[p][q] += DIVERSITY_PENALTY
+        return penalized
+
+    def _generate_groups_weighted_random(
+        self,
+        participants: List[str],
+        lam: float = 3.0,
+        masks: Optional[_PairingMasks] = None,
+        fallback: Optional[List[List[str]]] = None
+    ) -> List[List[str]]:
         """
         Group generation using weighted random selection with time decay.
+
+        제약 조건이 있으면 must-link 단위로 함께 배치하고, 남은 자리에 들어갈 수 없거나
+        cannot-link를 위반하는 후보는 가중치 계산 전에 제외한다.
         """
+        if masks is None:
+            return self._weighted_random_attempt(participants, lam)
+
+        for _ in range(_CONSTRAINT_SEARCH_RESTARTS):
+            groups = self._weighted_random_attempt(participants, lam, masks)
+            if groups is not None:
+                return groups
+
+        # 가중 랜덤이 막다른 길에 빠지면 실행 가능한 초기 배치를 사용
+        print("[디버깅] 제약 조건 가중 랜덤 배정 실패 - 실행 가능한 초기 배치 사용")
+        return fallback if fallback is not None else self._constrained_initial_partition(participants, masks)
+
+    def _weighted_random_attempt(
+        self,
+        participants: List[str],
+        lam: float,
+        masks: Optional[_PairingMasks] = None
+    ) -> Optional[List[List[str]]]:
+        """가중 랜덤 배정 1회 시도 (제약 조건으로 막히면 None)"""
         n = len(participants)
         sizes = self._partition_group_sizes(n)
         random.shuffle(sizes)
@@ -234,32 +636,201 @@ class TeamGenerator:
 
         for size in sizes:
             leader = random.choice(remaining)
-            group = [leader]
-            remaining.remove(leader)
+            group = self._unit_members(leader, masks)
+            if len(group) > size:
+                return None
+            for mem in group:
+                remaining.remove(mem)
 
             while len(group) < size:
+                candidates = []
                 weights = []
+                group_mask = masks.mask(group) if masks is not None else 0
                 for cand in remaining:
+                    unit = self._unit_members(cand, masks)
+                    if masks is not None:
+                        # 남은 자리보다 큰 단위나 cannot-link 위반 후보는 제외
+                        if len(group) + len(unit) > size or masks.conflict_mask(unit) & group_mask:
+                            continue
                     # 그룹 내 모든 멤버와의 시간 감쇠 가중치 합계
-                    total_weight = sum(self._calculate_time_decay_weight(mem, cand) for mem in group)
+                    total_weight = sum(self._calculate_time_decay_weight(mem, u) for mem in group for u in unit)
+                    candidates.append(cand)
                     # 가중치가 음수(첫 만남 보너스)인 경우를 고려하여 확률 계산
                     if total_weight < 0:
                         weights.append(math.exp(-total_weight))  # 음수를 양수로 변환하여 높은 확률
                     else:
                         weights.append(math.exp(-lam * total_weight))
-                
-                chosen = random.choices(remaining, weights=weights, k=1)[0]
-                group.append(chosen)
-                remaining.remove(chosen)
+
+                if not candidates:
+                    return None
+                chosen = random.choices(candidates, weights=weights, k=1)[0]
+                for mem in self._unit_members(chosen, masks):
+                    group.append(mem)
+                    remaining.remove(mem)
 
             groups.append(group)
 
         return groups
 
+    @staticmethod
+    def _unit_members(p: str, masks: Optional[_PairingMasks]) -> List[str]:
+        """참가자 p와 must-link로 묶인 단위 전체 (제약이 없으면 [p])"""
+        if masks is None:
+            return [p]
+        return list(masks.units[masks.unit_of[p]])
+
+    def _compile_constraints(
+        self,
+        participants: List[str],
+        must_link: Optional[List[List[str]]],
+        cannot_link: Optional[List[List[str]]]
+    ) -> Optional[_PairingMasks]:
+        """
+        must-link / cannot-link 제약을 인덱스 마스크로 컴파일한다.
+
+        참석하지 않은 참가자가 포함된 제약은 해당 참가자를 제외하고 적용한다.
+        must-link는 union-find로 병합해 하나의 단위로 취급하며, 명백히 불가능한 제약
+        (단위가 최대 조 크기를 넘거나, 같은 단위 안에 cannot-link 쌍이 있거나, 충돌 없이
+        함께할 수 있는 인원이 최소 조 크기에 모자라는 경우)은 즉시 ConstraintError로 보고한다.
+        """
+        if not must_link and not cannot_link:
+            return None
+
+        present = set(participants)
+        parent = {p: p for p in participants}
+
+        def find(p: str) -> str:
+            while parent[p] != p:
+                parent[p] = parent[parent[p]]
+                p = parent[p]
+            return p
+
+        for link in must_link or []:
+            members = [p for p in link if p in present]
+            for p in members[1:]:
+                ra, rb = find(members[0]), find(p)
+                if ra != rb:
+                    parent[rb] = ra
+
+        units_by_root: Dict[str, List[str]] = {}
+        for p in participants:
+            units_by_root.setdefault(find(p), []).append(p)
+        units = list(units_by_root.values())
+
+        max_size = max(self._partition_group_sizes(len(participants)), default=0)
+        for unit in units:
+            if len(unit) > max_size:
+                raise ConstraintError(
+                    f"must-link로 묶인 인원({', '.join(unit)})이 최대 조 크기 {max_size}명을 초과합니다."
+                )
+
+        index = {p: i for i, p in enumerate(participants)}
+        conflict = [0] * len(participants)
+        for pair in cannot_link or []:
+            members = [p for p in pair if p in present]
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    a, b = members[i], members[j]
+                    if a == b:
+                        continue
+                    if find(a) == find(b):
+                        raise ConstraintError(
+                            f"{a}와(과) {b}는 must-link와 cannot-link 제약이 동시에 걸려 있습니다."
+                        )
+                    conflict[index[a]] |= 1 << index[b]
+                    conflict[index[b]] |= 1 << index[a]
+
+        # 필요 조건 검사: 각 단위와 충돌 없이 같은 조가 될 수 있는 인원이 최소 조 크기를 채우지 못하면 불가능
+        min_size = min(self._partition_group_sizes(len(participants)), default=0)
+        unit_masks = [sum(1 << index[p] for p in unit) for unit in units]
+        unit_conflicts = []
+        for unit in units:
+            m = 0
+            for p in unit:
+                m |= conflict[index[p]]
+            unit_conflicts.append(m)
+        for u, unit in enumerate(units):
+            if not unit_conflicts[u]:
+                continue
+            compatible = sum(
+                len(other) for v, other in enumerate(units)
+                if v != u and not (unit_conflicts[u] & unit_masks[v])
+            )
+            if compatible < min_size - len(unit):
+                raise ConstraintError(
+                    f"{', '.join(unit)}와(과) 같은 조가 될 수 있는 참가자가 {compatible}명뿐이라 "
+                    f"최소 조 크기 {min_size}명을 채울 수 없습니다."
+                )
+
+        return _PairingMasks(participants, units, conflict)
+
+    def _constrained_initial_partition(self, participants: List[str], masks: _PairingMasks) -> List[List[str]]:
+        """
+        제약 조건을 모두 만족하는 무작위 초기 배치를 백트래킹으로 찾는다.
+
+        큰 단위와 충돌이 많은 단위부터 배치하며, 탐색 공간을 모두 소진하면 실행 불가능한
+        제약으로 판단하고, 노드 예산 안에 해를 찾지 못해도 ConstraintError를 발생시킨다.
+        """
+        sizes = self._partition_group_sizes(len(participants))
+        exhausted = False
+
+        for _ in range(_CONSTRAINT_SEARCH_RESTARTS):
+            random.shuffle(sizes)
+            units = [list(u) for u in masks.units]
+            random.shuffle(units)
+            units.sort(key=lambda u: (len(u), bin(masks.conflict_mask(u)).count("1")), reverse=True)
+            unit_conflicts = [masks.conflict_mask(u) for u in units]
+            unit_masks = [masks.mask(u) for u in units]
+
+            groups: List[List[str]] = [[] for _ in sizes]
+            group_masks = [0] * len(sizes)
+            budget = [_CONSTRAINT_SEARCH_BUDGET]
+
+            def place(k: int) -> bool:
+                if k == len(units):
+                    return True
+                budget[0] -= 1
+                if budget[0] < 0:
+                    return False
+                unit = units[k]
+                tried_empty = set()
+                for g in random.sample(range(len(sizes)), len(sizes)):
+                    if len(groups[g]) + len(unit) > sizes[g] or unit_conflicts[k] & group_masks[g]:
+                        continue
+                    # 비어 있는 같은 크기의 조는 서로 대칭이므로 한 번만 시도
+                    if not groups[g]:
+                        if sizes[g] in tried_empty:
+                            continue
+                        tried_empty.add(sizes[g])
+                    groups[g].extend(unit)
+                    group_masks[g] |= unit_masks[k]
+                    if place(k + 1):
+                        return True
+                    del groups[g][-len(unit):]
+                    group_masks[g] &= ~unit_masks[k]
+                return False
+
+            if place(0):
+                return groups
+            if budget[0] >= 0:
+                # 예산 안에서 탐색 공간을 모두 소진 -> 실행 불가능
+                exhausted = True
+                break
+
+        if exhausted:
+            raise ConstraintError("주어진 must-link / cannot-link 제약을 모두 만족하는 조 편성이 존재하지 않습니다.")
+        raise ConstraintError("제약 조건을 만족하는 조 편성을 찾지 못했습니다. 제약을 완화해 주세요.")
+
     def _get_time_decay_weights(self, participants: List[str]) -> Dict[str, Dict[str, float]]:
         """
         Generate a dictionary of time decay weights for all participant pairs.
+
+        로드된 공동 참여 데이터가 바뀌지 않았다면 같은 참가자 집합에 대한 결과를 재사용한다.
         """
+        cache_key = tuple(sorted(participants))
+        if self._weights_cache is not None and self._weights_cache[0] == cache_key:
+            return self._weights_cache[1]
+
         weights = {}
         for p in participants:
             weights[p] = {}
@@ -267,6 +838,7 @@ class TeamGenerator:
                 if p == q:
                     continue
                 weights[p][q] = self._calculate_time_decay_weight(p, q)
+        self._weights_cache = (cache_key, weights)
         return weights
 
     def _initial_partition(self, participants: List[str]) -> List[List[str]]:
@@ -300,25 +872,227 @@ class TeamGenerator:
                     cost += (1 - math.exp(-lam * weight))
         return cost
 
+    def _pair_costs(
+        self,
+        participants: List[str],
+        weights: Dict[str, Dict[str, float]],
+        lam: float
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        _group_cost와 동일한 변환을 적용한 참가자 쌍별 비용 (증분 계산용).
+        """
+        costs = {}
+        for p in participants:
+            costs[p] = {}
+            for q in participants:
+                if p == q:
+                    continue
+                weight = weights.get(p, {}).get(q, 0)
+                costs[p][q] = weight if weight < 0 else (1 - math.exp(-lam * weight))
+        return costs
+
+    def _local_search(
+        self,
+        groups: List[List[str]],
+        pair_costs: Dict[str, Dict[str, float]],
+        masks: Optional[_PairingMasks] = None,
+        max_passes: int = 200
+    ) -> Tuple[List[List[str]], float]:
+        """
+        Deterministic best-improvement local search used to polish any solver's result.
+
+        이웃 구조는 다음 순서로 탐색한다 (variable neighborhood descent):
+          1. 두 참가자 교환(swap)과 5명 조 -> 4명 조로의 재배치(relocate)
+          2. 위에서 개선이 없을 때만 3-사이클 회전과 길이 2의 ejection chain
+        각 이동의 비용 변화량은 참가자별 조 기여도 S[x][g]로 O(1)에 계산하며,
+        더 이상 개선되는 이동이 없는 지역 최적해에 도달할 때까지 반복한다.
+        조 크기 구성(4명/5명 개수)은 유지되며, must-link 단위에 속한 참가자는 이동하지 않고
+        cannot-link를 위반하는 이동은 제외한다.
+
+        Returns:
+            (개선된 조 목록, 제거된 총 비용)
+        """
+        names = [p for g in groups for p in g]
+        idx = {p: i for i, p in enumerate(names)}
+        n = len(names)
+        c = [[0.0] * n for _ in range(n)]
+        for p in names:
+            row = c[idx[p]]
+            for q, v in pair_costs.get(p, {}).items():
+                if q in idx:
+                    row[idx[q]] = v
+
+        members = [[idx[p] for p in g] for g in groups]
+        where = [0] * n
+        for gi, g in enumerate(members):
+            for x in g:
+                where[x] = gi
+        G = len(members)
+        # S[x][g]: 참가자 x와 조 g 구성원 사이의 비용 합
+        S = [[sum(c[x][y] for y in members[g] if y != x) for g in range(G)] for x in range(n)]
+
+        if masks is not None:
+            movable = [len(masks.units[masks.unit_of[p]]) == 1 for p in names]
+            conflict = [0] * n
+            for p in names:
+                for q in names:
+                    if masks.conflict[masks.index[p]] >> masks.index[q] & 1:
+                        conflict[idx[p]] |= 1 << idx[q]
+        else:
+            movable = [True] * n
+            conflict = [0] * n
+        group_bits = [0] * G
+        for gi, g in enumerate(members):
+            for x in g:
+                group_bits[gi] |= 1 << x
+
+        def fits(x: int, g: int, leaving: int = -1) -> bool:
+            # x를 조 g에 넣을 때 (leaving은 g에서 빠지는 참가자) cannot-link 위반 여부
+            bits = group_bits[g]
+            if leaving >= 0:
+                bits &= ~(1 << leaving)
+            return not (conflict[x] & bits)
+
+        def move(x: int, h: int) -> None:
+            g = where[x]
+            members[g].remove(x)
+            members[h].append(x)
+            group_bits[g] &= ~(1 << x)
+            group_bits[h] |= 1 << x
+            where[x] = h
+            for y in range(n):
+                S[y][g] -= c[y][x]
+                S[y][h] += c[y][x]
+
+        removed = 0.0
+        movers = [x for x in range(n) if movable[x]]
+        for _ in range(max_passes):
+            best_delta = -_IMPROVEMENT_EPS
+            best_moves: List[Tuple[int, int]] = []
+
+            # 1. swap / relocate
+            for ai, a in enumerate(movers):
+                ga = where[a]
+                for b in movers[ai + 1:]:
+                    gb = where[b]
+                    if ga == gb:
+                        continue
+                    delta = (S[a][gb] - c[a][b] - S[a][ga]) + (S[b][ga] - c[b][a] - S[b][gb])
+                    if delta < best_delta and fits(a, gb, b) and fits(b, ga, a):
+                        best_delta = delta
+                        best_moves = [(a, gb), (b, ga)]
+                for gb in range(G):
+                    if len(members[ga]) != len(members[gb]) + 1:
+                        continue
+                    delta = S[a][gb] - S[a][ga]
+                    if delta < best_delta and fits(a, gb):
+                        best_delta = delta
+                        best_moves = [(a, gb)]
+
+            # 2. 3-cycle / ejection chain (1단계 이웃에서 개선이 없을 때만)
+            if not best_moves:
+                for a in movers:
+                    ga = where[a]
+                    for b in movers:
+                        gb = where[b]
+                        if gb == ga:
+                            continue
+                        head = S[a][gb] - c[a][b] - S[a][ga]
+                        # ejection chain: a -> gb, b -> gc (ga가 gc보다 한 명 많을 때)
+                        for gc in range(G):
+                            if gc == ga or gc == gb or len(members[ga]) != len(members[gc]) + 1:
+                                continue
+                            delta = head + S[b][gc] - S[b][gb]
+                            if delta < best_delta and fits(a, gb, b) and fits(b, gc):
+                                best_delta = delta
+                                best_moves = [(a, gb), (b, gc)]
+                        # 3-cycle: a -> gb, b -> gc, d -> ga
+                        for d in movers:
+                            gd = where[d]
+                            if gd == ga or gd == gb:
+                                continue
+                            delta = (head + (S[b][gd] - c[b][d] - S[b][gb])
+                                     + (S[d][ga] - c[d][a] - S[d][gd]))
+                            if delta < best_delta and fits(a, gb, b) and fits(b, gd, d) and fits(d, ga, a):
+                                best_delta = delta
+                                best_moves = [(a, gb), (b, gd), (d, ga)]
+
+            if not best_moves:
+                break
+            for x, h in best_moves:
+                move(x, h)
+            removed -= best_delta
+
+        print(f"[디버깅] 지역 탐색 완료 - 제거된 비용: {removed:.4f}")
+        return [[names[x] for x in g] for g in members], removed
+
     def _total_cost(self, groups: List[List[str]], weights: Dict[str, Dict[str, float]], lam: float) -> float:
         """
         Compute the total cost for all groups.
         """
         return sum(self._group_cost(g, weights, lam) for g in groups)
 
-    def _neighbor_partition(self, groups: List[List[str]]) -> Tuple[List[List[str]], Tuple[int, int, int, int]]:
+    def _neighbor_partition(
+        self,
+        groups: List[List[str]],
+        masks: Optional[_PairingMasks] = None,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[List[List[str]], Tuple[int, int]]:
         """
         Generate a neighbor solution by swapping two participants in different groups.
+
+        제약 조건이 있으면 must-link 단위를 통째로 교환하고(같은 크기의 단위 또는 같은 수의
+        단독 참가자와 교환), cannot-link를 위반하는 이동은 평가 전에 걸러낸다.
+        rng를 주면 전역 random 대신 그 난수 생성기를 사용한다.
         """
+        if masks is not None:
+            return self._constrained_neighbor_partition(groups, masks, rng)
+        rng = rng or random
+
         new_groups = [g.copy() for g in groups]
         # 두 개의 다른 그룹 선택
-        g1, g2 = random.sample(range(len(groups)), 2)
+        g1, g2 = rng.sample(range(len(groups)), 2)
         # 각 그룹에서 무작위 멤버 선택
-        i1 = random.randrange(len(new_groups[g1]))
-        i2 = random.randrange(len(new_groups[g2]))
+        i1 = rng.randrange(len(new_groups[g1]))
+        i2 = rng.randrange(len(new_groups[g2]))
         # 교환
         new_groups[g1][i1], new_groups[g2][i2] = new_groups[g2][i2], new_groups[g1][i1]
-        return new_groups, (g1, i1, g2, i2)
+        return new_groups, (g1, g2)
+
+    def _constrained_neighbor_partition(
+        self,
+        groups: List[List[str]],
+        masks: _PairingMasks,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[List[List[str]], Tuple[int, int]]:
+        """제약 조건을 만족하는 단위 교환 이웃 해 (찾지 못하면 현재 해를 그대로 반환)"""
+        rng = rng or random
+        for _ in range(_MAX_MOVE_ATTEMPTS):
+            g1, g2 = rng.sample(range(len(groups)), 2)
+            out_unit = self._unit_members(rng.choice(groups[g1]), masks)
+
+            # g2에서 같은 크기의 단위, 또는 (단위 크기가 2 이상이면) 같은 수의 단독 참가자 선택
+            units_in_g2 = {masks.unit_of[p] for p in groups[g2]}
+            same_size = [masks.units[u] for u in units_in_g2 if len(masks.units[u]) == len(out_unit)]
+            singles = [masks.units[u][0] for u in units_in_g2 if len(masks.units[u]) == 1]
+            options = [list(u) for u in same_size]
+            if len(out_unit) > 1 and len(singles) >= len(out_unit):
+                options.append(rng.sample(singles, len(out_unit)))
+            if not options:
+                continue
+            in_unit = rng.choice(options)
+
+            rest1 = [p for p in groups[g1] if p not in out_unit]
+            rest2 = [p for p in groups[g2] if p not in in_unit]
+            if not masks.compatible(out_unit, rest2) or not masks.compatible(in_unit, rest1):
+                continue
+
+            new_groups = [g.copy() for g in groups]
+            new_groups[g1] = rest1 + in_unit
+            new_groups[g2] = rest2 + out_unit
+            return new_groups, (g1, g2)
+
+        return [g.copy() for g in groups], (0, 0)
 
     def _simulated_annealing(
         self,
@@ -328,12 +1102,24 @@ class TeamGenerator:
         initial_temp: float = 100.0,
         cooling_rate: float = 0.995,
         temp_min: float = 0.1,
-        max_iter: int = 1500
+        max_iter: int = 1500,
+        masks: Optional[_PairingMasks] = None,
+        initial: Optional[List[List[str]]] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        should_stop: Optional[Callable[[], bool]] = None
     ) -> List[List[str]]:
         """
         Optimize the partition using simulated annealing algorithm with time decay weights.
+
+        masks가 주어지면 initial(제약을 만족하는 배치)에서 시작해 제약을 만족하는 이동만 평가한다.
+        progress_callback은 PROGRESS_EVERY번 반복마다 호출되고, should_stop이 True가 되면 즉시 종료한다.
         """
-        current = self._initial_partition(participants)
+        if initial is not None:
+            current = [g.copy() for g in initial]
+        elif masks is not None:
+            current = self._constrained_initial_partition(participants, masks)
+        else:
+            current = self._initial_partition(participants)
         best = current
         current_cost = self._total_cost(current, weights, lam)
         best_cost = current_cost
@@ -344,8 +1130,19 @@ class TeamGenerator:
         for it in range(max_iter):
             if T < temp_min:
                 break
+            if should_stop is not None and should_stop():
+                print(f"[디버깅] 시뮬레이티드 어닐링 중단 요청 - 반복 {it}")
+                break
+            if progress_callback is not None and it % PROGRESS_EVERY == 0:
+                progress_callback({
+                    "iteration": it,
+                    "max_iter": max_iter,
+                    "current_cost": current_cost,
+                    "best_cost": best_cost,
+                    "temperature": T,
+                })
                 
-            candidate, swap_info = self._neighbor_partition(current)
+            candidate, swap_info = self._neighbor_partition(current, masks)
             cand_cost = self._total_cost(candidate, weights, lam)
             delta = cand_cost - current_cost
             
@@ -365,10 +1162,349 @@ class TeamGenerator:
         print(f"[디버깅] 시뮬레이티드 어닐링 완료 - 최종 비용: {best_cost:.4f}")
         return best
 
+    def _batched_annealing(
+        self,
+        participants: List[str],
+        weights: Dict[str, Dict[str, float]],
+        lam: float = 3.0,
+        initial_temp: float = 100.0,
+        cooling_rate: float = 0.995,
+        temp_min: float = 0.1,
+        max_iter: int = 1500,
+        batch_size: int = 32,
+        batch_rule: str = "metropolis",
+        masks: Optional[_PairingMasks] = None,
+        initial: Optional[List[List[str]]] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[List[str]]:
+        """
+        Simulated annealing that evaluates batch_size candidate swaps per step with NumPy.
+
+        참가자 -> 조 배정 배열 assign, 쌍별 비용 행렬 C, 참가자별 조 기여도 S = C @ onehot(assign)을
+        유지하면 x(조 a) <-> y(조 b) 교환의 비용 변화량은
+            (S[x,b] - C[x,y] - S[x,a]) + (S[y,a] - C[x,y] - S[y,b])
+        이므로 후보 K개의 변화량을 인덱싱 몇 번으로 한꺼번에 구한다. 교환을 적용하면 S의 두 열만 갱신한다.
+
+        batch_rule:
+          - "metropolis": 후보를 순서대로 Metropolis 기준으로 판정해 처음 수락된 교환을 적용
+            (거절된 이동은 상태를 바꾸지 않으므로 한 번에 하나씩 시도하는 SA와 같은 분포)
+          - "best": 변화량이 가장 작은 후보 하나를 골라 Metropolis 기준으로 수락 여부 결정
+        제약 조건이 있으면 must-link 단위(2명 이상)는 움직이지 않고, 조별 cannot-link 충돌 수를
+        C와 같은 방식으로 유지해 충돌이 생기는 교환을 후보에서 제외한다.
+        max_iter와 냉각은 배치 단위로 적용된다.
+        """
+        n = len(participants)
+        index = {p: i for i, p in enumerate(participants)}
+        if initial is not None:
+            groups = [g.copy() for g in initial]
+        elif masks is not None:
+            groups = self._constrained_initial_partition(participants, masks)
+        else:
+            groups = self._initial_partition(participants)
+
+        cost = np.zeros((n, n))
+        for p, row in self._pair_costs(participants, weights, lam).items():
+            i = index[p]
+            for q, c in row.items():
+                cost[i, index[q]] = c
+
+        assign = np.empty(n, dtype=np.int64)
+        for g, members in enumerate(groups):
+            assign[[index[p] for p in members]] = g
+        onehot = np.zeros((n, len(groups)))
+        onehot[np.arange(n), assign] = 1.0
+        contrib = cost @ onehot
+
+        movable = np.ones(n, dtype=bool)
+        conflict = None
+        conflicts = None
+        if masks is not None:
+            for unit in masks.units:
+                if len(unit) > 1:
+                    movable[[index[p] for p in unit]] = False
+            conflict = np.array(
+                [[(masks.conflict[masks.index[p]] >> masks.index[q]) & 1 for q in participants] for p in participants],
+                dtype=np.int64
+            )
+            conflicts = conflict @ onehot.astype(np.int64)
+        movable_idx = np.flatnonzero(movable)
+
+        rng = np.random.default_rng(random.getrandbits(32))
+        current_cost = float(contrib[np.arange(n), assign].sum() / 2)
+        best_assign = assign.copy()
+        best_cost = current_cost
+        T = initial_temp
+        evaluated = 0
+        accepted = 0
+
+        print(f"[디버깅] 배치 어닐링 시작 - 초기 비용: {current_cost:.4f} (배치 {batch_size}, 규칙 {batch_rule})")
+
+        for it in range(max_iter):
+            if T < temp_min or len(movable_idx) < 2:
+                break
+            if should_stop is not None and should_stop():
+                print(f"[디버깅] 배치 어닐링 중단 요청 - 반복 {it}")
+                break
+            if progress_callback is not None and it % PROGRESS_EVERY == 0:
+                progress_callback({
+                    "iteration": it,
+                    "max_iter": max_iter,
+                    "current_cost": current_cost,
+                    "best_cost": best_cost,
+                    "temperature": T,
+                })
+
+            xs = movable_idx[rng.integers(len(movable_idx), size=batch_size)]
+            ys = movable_idx[rng.integers(len(movable_idx), size=batch_size)]
+            a = assign[xs]
+            b = assign[ys]
+            valid = a != b
+            if conflicts is not None:
+                cxy = conflict[xs, ys]
+                valid &= (conflicts[xs, b] - cxy == 0) & (conflicts[ys, a] - cxy == 0)
+            cxy = cost[xs, ys]
+            deltas = (contrib[xs, b] - cxy - contrib[xs, a]) + (contrib[ys, a] - cxy - contrib[ys, b])
+
+            candidates = np.flatnonzero(valid)
+            choice = None
+            if len(candidates):
+                if batch_rule == "best":
+                    # 모든 후보의 변화량을 비교에 사용
+                    evaluated += len(candidates)
+                    k = candidates[np.argmin(deltas[candidates])]
+                    if deltas[k] < 0 or rng.random() < math.exp(-deltas[k] / T):
+                        choice = k
+                else:
+                    d = deltas[candidates]
+                    ok = (d < 0) | (rng.random(len(d)) < np.exp(-np.maximum(d, 0) / T))
+                    hits = np.flatnonzero(ok)
+                    if len(hits):
+                        choice = candidates[hits[0]]
+                        # 첫 수락 이후의 후보는 버려지므로 순차 SA로 치면 여기까지만 시도한 것
+                        evaluated += int(hits[0]) + 1
+                    else:
+                        evaluated += len(candidates)
+
+            if choice is not None:
+                x, y, ga, gb = xs[choice], ys[choice], a[choice], b[choice]
+                # x: a -> b, y: b -> a 이므로 두 조의 기여도 열만 갱신
+                contrib[:, ga] += cost[:, y] - cost[:, x]
+                contrib[:, gb] += cost[:, x] - cost[:, y]
+                if conflicts is not None:
+                    conflicts[:, ga] += conflict[:, y] - conflict[:, x]
+                    conflicts[:, gb] += conflict[:, x] - conflict[:, y]
+                assign[x], assign[y] = gb, ga
+                current_cost += float(deltas[choice])
+                accepted += 1
+                if current_cost < best_cost - _IMPROVEMENT_EPS:
+                    best_cost = current_cost
+                    best_assign = assign.copy()
+
+            T *= cooling_rate
+
+        self.last_stats["moves_evaluated"] = evaluated
+        self.last_stats["moves_accepted"] = accepted
+        print(f"[디버깅] 배치 어닐링 완료 - 최종 비용: {best_cost:.4f} (평가한 이동 {evaluated}개)")
+
+        # 조 순서는 초기 배치와 같게, 조 안의 순서는 참가자 목록 순서로 복원
+        best = [[] for _ in groups]
+        for i, g in enumerate(best_assign):
+            best[g].append(participants[i])
+        return best
+
+    def _parallel_tempering(
+        self,
+        participants: List[str],
+        weights: Dict[str, Dict[str, float]],
+        lam: float = 3.0,
+        n_replicas: int = 8,
+        rounds: int = 40,
+        steps_per_round: int = 100,
+        workers: Optional[int] = None,
+        masks: Optional[_PairingMasks] = None,
+        initial: Optional[List[List[str]]] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[List[str]]:
+        """
+        Optimize the partition with parallel tempering (replica exchange).
+
+        온도 사다리는 샘플링한 교환 이동의 비용 증가량으로 자동 보정하며(_calibrate_temperatures),
+        각 라운드마다 복제본들이 자기 온도에서 steps_per_round번 Metropolis 이동을 수행한 뒤
+        인접 온도끼리 상태 교환을 시도한다. 복제본 구간 실행은 workers개 프로세스에 분산된다.
+        """
+        pair_costs = self._pair_costs(participants, weights, lam)
+        temperatures = self._calibrate_temperatures(participants, pair_costs, n_replicas, masks)
+
+        states = []
+        for _ in range(n_replicas):
+            if initial is not None:
+                start = [g.copy() for g in initial]
+            elif masks is not None:
+                start = self._constrained_initial_partition(participants, masks)
+            else:
+                start = self._initial_partition(participants)
+            states.append((start, _partition_cost(start, pair_costs)))
+
+        best, best_cost = min(states, key=lambda st: st[1])
+        print(f"[디버깅] 병렬 템퍼링 시작 - 복제본 {n_replicas}개, 온도 {temperatures[0]:.4f} ~ {temperatures[-1]:.4f}")
+
+        workers = workers or min(n_replicas, os.cpu_count() or 1)
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_pt_init, initargs=(pair_costs, masks))
+
+        # 구간 시드와 교환 판정은 별도 RNG로 (워커 수와 무관하게 같은 결과)
+        rng = random.Random(random.getrandbits(32))
+        exchanges_tried = 0
+        exchanges_accepted = 0
+        try:
+            for r in range(rounds):
+                if should_stop is not None and should_stop():
+                    print(f"[디버깅] 병렬 템퍼링 중단 요청 - 라운드 {r}")
+                    break
+                tasks = [
+                    (states[k][0], states[k][1], temperatures[k], steps_per_round, rng.getrandbits(32))
+                    for k in range(n_replicas)
+                ]
+                if pool:
+                    results = list(pool.map(_pt_segment, tasks))
+                else:
+                    # 같은 프로세스에서 실행할 때는 전역 상태 없이 이 실행의 데이터를 직접 전달
+                    results = [_pt_run_segment(t, pair_costs, masks, self) for t in tasks]
+
+                states = []
+                for groups, cost, seg_best, seg_best_cost in results:
+                    states.append((groups, cost))
+                    if seg_best_cost < best_cost:
+                        best, best_cost = seg_best, seg_best_cost
+
+                # 인접 온도 복제본 교환 (라운드마다 짝/홀 쌍을 번갈아 시도)
+                for k in range(r % 2, n_replicas - 1, 2):
+                    exchanges_tried += 1
+                    beta_diff = 1 / temperatures[k] - 1 / temperatures[k + 1]
+                    log_accept = beta_diff * (states[k][1] - states[k + 1][1])
+                    if log_accept >= 0 or rng.random() < math.exp(log_accept):
+                        states[k], states[k + 1] = states[k + 1], states[k]
+                        exchanges_accepted += 1
+
+                if progress_callback is not None:
+                    progress_callback({
+                        "iteration": (r + 1) * steps_per_round,
+                        "max_iter": rounds * steps_per_round,
+                        "current_cost": states[0][1],
+                        "best_cost": best_cost,
+                        "temperature": temperatures[0],
+                    })
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.last_stats["temperatures"] = temperatures
+        self.last_stats["exchange_acceptance"] = exchanges_accepted / exchanges_tried if exchanges_tried else 0.0
+        print(f"[디버깅] 병렬 템퍼링 완료 - 최종 비용: {best_cost:.4f}")
+        return best
+
+    def _calibrate_temperatures(
+        self,
+        participants: List[str],
+        pair_costs: Dict[str, Dict[str, float]],
+        n_replicas: int,
+        masks: Optional[_PairingMasks] = None,
+        samples: int = 200,
+        hot_accept: float = 0.8,
+        cold_accept: float = 0.005
+    ) -> List[float]:
+        """
+        무작위 배치에서 교환 이동의 비용 증가량을 샘플링해 온도 사다리를 정한다.
+
+        가장 높은 온도는 전형적인(중앙값) 비용 증가 이동을 hot_accept 확률로, 가장 낮은 온도는
+        cold_accept 확률로 수락하도록 정하고, 그 사이는 기하급수적으로 나눈다.
+        """
+        groups = (self._constrained_initial_partition(participants, masks) if masks is not None
+                  else self._initial_partition(participants))
+        uphill = []
+        for _ in range(samples):
+            candidate, (g1, g2) = self._neighbor_partition(groups, masks)
+            delta = (_group_pair_cost(candidate[g1], pair_costs) + _group_pair_cost(candidate[g2], pair_costs)
+                     - _group_pair_cost(groups[g1], pair_costs) - _group_pair_cost(groups[g2], pair_costs))
+            if delta > 0:
+                uphill.append(delta)
+            groups = candidate
+
+        typical = sorted(uphill)[len(uphill) // 2] if uphill else 1e-3
+        t_hot = -typical / math.log(hot_accept)
+        t_cold = -typical / math.log(cold_accept)
+        if n_replicas == 1:
+            return [t_cold]
+        ratio = (t_hot / t_cold) ** (1 / (n_replicas - 1))
+        return [t_cold * ratio ** k for k in range(n_replicas)]
+
+    @staticmethod
+    def can_partition(n: int) -> bool:
+        """n명을 4명/5명 조로 나눌 수 있는지 (1~3, 6, 7, 11명은 불가능)"""
+        return n >= 4 and n not in (6, 7, 11)
+
     @staticmethod
     def _partition_group_sizes(n: int) -> List[int]:
         """Divide n participants into groups of 4 or 5."""
         r = n % 4
         num_fives = r
         num_fours = (n - 5 * r) // 4
-        return [5] * num_fives + [4] * num_fours
\ No newline at end of file
+        return [5] * num_fives + [4] * num_fours
+
+
+def _group_pair_cost(group: List[str], pair_costs: Dict[str, Dict[str, float]]) -> float:
+    """미리 변환된 쌍별 비용으로 계산한 조 비용 (_group_cost와 같은 값)"""
+    cost = 0.0
+    for i in range(len(group)):
+        row = pair_costs[group[i]]
+        for j in range(i + 1, len(group)):
+            cost += row[group[j]]
+    return cost
+
+
+def _partition_cost(groups: List[List[str]], pair_costs: Dict[str, Dict[str, float]]) -> float:
+    return sum(_group_pair_cost(g, pair_costs) for g in groups)
+
+
+# 병렬 템퍼링 워커 프로세스 상태 (ProcessPoolExecutor initializer로 한 번만 전달, 워커 프로세스에서만 사용)
+_pt_context: Dict[str, Any] = {}
+
+
+def _pt_init(pair_costs: Dict[str, Dict[str, float]], masks: Optional[_PairingMasks]) -> None:
+    _pt_context["pair_costs"] = pair_costs
+    _pt_context["masks"] = masks
+    _pt_context["generator"] = TeamGenerator()
+
+
+def _pt_segment(args) -> Tuple[List[List[str]], float, List[List[str]], float]:
+    """워커 프로세스용: initializer로 받은 상태로 _pt_run_segment 실행"""
+    return _pt_run_segment(args, _pt_context["pair_costs"], _pt_context["masks"], _pt_context["generator"])
+
+
+def _pt_run_segment(
+    args,
+    pair_costs: Dict[str, Dict[str, float]],
+    masks: Optional[_PairingMasks],
+    generator: "TeamGenerator"
+) -> Tuple[List[List[str]], float, List[List[str]], float]:
+    """한 복제본을 고정 온도에서 steps번 Metropolis 이동시키고 (현재 해, 비용, 구간 최선 해, 비용) 반환
+
+    전역 random을 건드리지 않도록 구간 시드로 만든 로컬 난수 생성기만 사용한다.
+    """
+    groups, cost, temperature, steps, seed = args
+    rng = random.Random(seed)
+
+    best, best_cost = groups, cost
+    for _ in range(steps):
+        candidate, (g1, g2) = generator._neighbor_partition(groups, masks, rng)
+        delta = (_group_pair_cost(candidate[g1], pair_costs) + _group_pair_cost(candidate[g2], pair_costs)
+                 - _group_pair_cost(groups[g1], pair_costs) - _group_pair_cost(groups[g2], pair_costs))
+        if delta < 0 or rng.random() < math.exp(-delta / temperature):
+            groups = candidate
+            cost += delta
+            if cost < best_cost:
+                best, best_cost = groups, cost
+    return groups, cost, best, best_cost
@@ -0,0 +1,261 @@
+"""
+오프라인 파라미터 튜닝 도구.
+
+실제 team_history.json을 세션 단위로 재생하면서 후보 파라미터 조합으로 조를 다시 생성하고,
+공정성 지표와 실행 시간을 측정해 파레토 최적 집합을 파일로 저장한다.
+
+각 세션은 as-of 필터로 "그 세션 직전까지의 실제 기록"만 보고 다시 생성하므로,
+후보 파라미터가 그 시점에 어떤 조를 만들었을지를 평가하게 된다.
+
+사용 예:
+    python -m app.tuning --history data/team_history.json --mode random --samples 60 --workers 4
+    python -m app.tuning --mode grid --keys decay_rate recency_weight max_iter
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from .compaction import DEFAULT_AGGREGATES_FILE
+from .history_store import HistoryStore
+from .team_generator import TeamGenerator, SA_PARAM_KEYS
+
+# TeamGenerator 인스턴스 속성으로 설정되는 가중치 파라미터
+GENERATOR_PARAM_KEYS = ("decay_rate", "frequency_weight", "recency_weight", "recency_scale", "first_meeting_bonus")
+
+# 탐색 공간 (grid 모드는 --keys로 고른 항목만 조합하고 나머지는 기본값 사용)
+PARAM_SPACE: Dict[str, List[Any]] = {
+    "decay_rate": [0.75, 0.85, 0.92],
+    "frequency_weight": [0.2, 0.35, 0.5],
+    "recency_weight": [0.5, 0.65, 0.8],
+    "recency_scale": [0.6, 0.9, 1.2],
+    "first_meeting_bonus": [-1.0, -0.6, -0.3],
+    "lam": [0.7, 1.5, 3.0],
+    "max_iter": [300, 800, 1500],
+    "initial_temp": [1.0, 10.0, 100.0],
+    "cooling_rate": [0.99, 0.995],
+}
+
+# 현재 코드의 기본값
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "decay_rate": 0.85,
+    "frequency_weight": 0.35,
+    "recency_weight": 0.65,
+    "recency_scale": 0.9,
+    "first_meeting_bonus": -0.6,
+    "lam": 0.7,
+    "max_iter": 1500,
+    "initial_temp": 100.0,
+    "cooling_rate": 0.995,
+}
+
+# 워커 프로세스별로 한 번만 읽어 두는 기록과 압축된 집계
+_worker_history: List[Dict[str, Any]] = []
+_worker_aggregates: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(history: List[Dict[str, Any]], aggregates: Optional[Dict[str, Any]] = None) -> None:
+    global _worker_history, _worker_aggregates
+    _worker_history = history
+    _worker_aggregates = aggregates
+
+
+def _session_participants(record: Dict[str, Any]) -> List[str]:
+    return [p for group in record.get("groups", []) for p in group]
+
+
+def evaluate_params(
+    params: Dict[str, Any],
+    history: List[Dict[str, Any]],
+    session_indices: List[int],
+    seed: int = 0,
+    aggregates: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    한 파라미터 조합으로 지정된 세션들을 재생하고 공정성/실행 시간 지표를 계산한다.
+    aggregates(압축된 오래된 기록)가 있으면 운영 환경과 같게 가중치와 만남 횟수에 포함한다.
+
+    지표:
+      - repeat_pair_rate: 생성된 조 안의 참가자 쌍 중 이미 만난 적이 있는 쌍의 비율 (낮을수록 좋음)
+      - met_fraction: 세션 후 참석자 쌍 중 한 번 이상 만난 쌍의 비율 (높을수록 좋음)
+      - max_repeat: 같은 조에 배정된 쌍의 과거 만남 횟수 최댓값의 평균
+      - runtime: 세션당 평균 생성 시간(초)
+    """
+    random.seed(seed)
+    generator = TeamGenerator()
+    for key in GENERATOR_PARAM_KEYS:
+        if key in params:
+            setattr(generator, key, params[key])
+    sa_params = {k: params[k] for k in SA_PARAM_KEYS if k in params}
+    lam = params.get("lam", DEFAULT_PARAMS["lam"])
+
+    repeat_rates, met_fractions, max_repeats, runtimes = [], [], [], []
+    for k in session_indices:
+        record = history[k]
+        participants = _session_participants(record)
+        if len(participants) < 2:
+            continue
+
+        # 생성기 내부의 디버깅 출력은 튜닝 중에는 숨김
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.load_past_cooccurrence_from_records(
+                participants, history, as_of_iso=record["date"], aggregates=aggregates
+            )
+            start = time.perf_counter()
+            groups = generator.generate_groups(participants, lam, sa_params=sa_params)
+            runtimes.append(time.perf_counter() - start)
+
+        in_group_pairs = 0
+        repeated_pairs = 0
+        max_repeat = 0
+        new_pairs = set()
+        for group in groups:
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    count = generator.meeting_count(group[i], group[j])
+                    in_group_pairs += 1
+                    if count:
+                        repeated_pairs += 1
+                        max_repeat = max(max_repeat, count)
+                    else:
+                        new_pairs.add((group[i], group[j]))
+
+        total_pairs = len(participants) * (len(participants) - 1) // 2
+        met_before = sum(
+            1 for i, p in enumerate(participants) for q in participants[i + 1:] if generator.meeting_count(p, q)
+        )
+        repeat_rates.append(repeated_pairs / in_group_pairs if in_group_pairs else 0.0)
+        met_fractions.append((met_before + len(new_pairs)) / total_pairs)
+        max_repeats.append(max_repeat)
+
+    def mean(values: List[float]) -> float:
+        return sum(values) / len(values) if values else 0.0
+
+    return {
+        "params": params,
+        "repeat_pair_rate": mean(repeat_rates),
+        "met_fraction": mean(met_fractions),
+        "max_repeat": mean(max_repeats),
+        "runtime": mean(runtimes),
+        "sessions": len(runtimes),
+    }
+
+
+def _evaluate_in_worker(args) -> Dict[str, Any]:
+    params, session_indices, seed = args
+    return evaluate_params(params, _worker_history, session_indices, seed, _worker_aggregates)
+
+
+def candidate_params(mode: str, keys: Optional[List[str]], samples: int, seed: int) -> List[Dict[str, Any]]:
+    """grid 또는 random 모드의 후보 파라미터 조합 생성 (첫 후보는 항상 현재 기본값)"""
+    keys = keys or list(PARAM_SPACE.keys())
+    candidates = [dict(DEFAULT_PARAMS)]
+    if mode == "grid":
+        for values in itertools.product(*(PARAM_SPACE[k] for k in keys)):
+            params = dict(DEFAULT_PARAMS)
+            params.update(zip(keys, values))
+            candidates.append(params)
+    else:
+        rng = random.Random(seed)
+        for _ in range(samples):
+            params = dict(DEFAULT_PARAMS)
+            params.update({k: rng.choice(PARAM_SPACE[k]) for k in keys})
+            candidates.append(params)
+
+    # 중복 제거 (순서 유지)
+    unique = []
+    seen = set()
+    for params in candidates:
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            unique.append(params)
+    return unique
+
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """repeat_pair_rate(최소), met_fraction(최대), runtime(최소) 기준 파레토 최적 결과"""
+    def dominates(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        no_worse = (a["repeat_pair_rate"] <= b["repeat_pair_rate"]
+                    and a["met_fraction"] >= b["met_fraction"]
+                    and a["runtime"] <= b["runtime"])
+        better = (a["repeat_pair_rate"] < b["repeat_pair_rate"]
+                  or a["met_fraction"] > b["met_fraction"]
+                  or a["runtime"] < b["runtime"])
+        return no_worse and better
+
+    front = [r for r in results if not any(dominates(o, r) for o in results if o is not r)]
+    return sorted(front, key=lambda r: r["runtime"])
+
+
+def run_tuning(
+    history: List[Dict[str, Any]],
+    candidates: List[Dict[str, Any]],
+    last_sessions: int = 10,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    aggregates: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """후보 조합을 여러 코어에서 병렬로 평가하고 전체 결과와 파레토 집합을 반환"""
+    history = sorted(history, key=lambda r: r.get("date", ""))
+    # 이전 기록이 없는 첫 세션은 평가 의미가 없으므로 제외
+    first = max(1, len(history) - last_sessions)
+    session_indices = list(range(first, len(history)))
+
+    tasks = [(params, session_indices, seed) for params in candidates]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history, aggregates)) as pool:
+        results = list(pool.map(_evaluate_in_worker, tasks))
+
+    return {
+        "sessions_replayed": len(session_indices),
+        "candidates": len(candidates),
+        "results": results,
+        "pareto": pareto_front(results),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="team_history.json 재생 기반 파라미터 튜닝")
+    parser.add_argument("--history", default="data/team_history.json", help="재생할 팀 히스토리 파일")
+    parser.add_argument("--aggregates", default=DEFAULT_AGGREGATES_FILE, help="압축된 쌍별 집계 파일")
+    parser.add_argument("--mode", choices=["grid", "random"], default="random", help="탐색 방식")
+    parser.add_argument("--keys", nargs="*", choices=list(PARAM_SPACE.keys()), help="탐색할 파라미터 (기본: 전체)")
+    parser.add_argument("--samples", type=int, default=40, help="random 모드 후보 수")
+    parser.add_argument("--last", type=int, default=10, help="재생할 최근 세션 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="병렬 워커 프로세스 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--output", default="data/tuning_pareto.json", help="결과 저장 경로")
+    args = parser.parse_args(argv)
+
+    # 압축된 기록이 있으면 운영 서버와 같게 집계도 함께 사용
+    store = HistoryStore(args.history, aggregates_path=args.aggregates)
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = store.load()
+        aggregates = store.aggregates()
+
+    candidates = candidate_params(args.mode, args.keys, args.samples, args.seed)
+    print(f"후보 {len(candidates)}개, 최근 {args.last}개 세션 재생 (워커 {args.workers}개)")
+
+    start = time.perf_counter()
+    report = run_tuning(
+        history, candidates, last_sessions=args.last, workers=args.workers, seed=args.seed, aggregates=aggregates
+    )
+    report["elapsed"] = time.perf_counter() - start
+
+    with open(args.output, "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"파레토 집합 {len(report['pareto'])}개를 {args.output}에 저장했습니다.")
+    for r in report["pareto"]:
+        print(f"  repeat={r['repeat_pair_rate']:.3f} met={r['met_fraction']:.3f} "
+              f"runtime={r['runtime'] * 1000:.1f}ms params={r['params']}")
+
+
+if __name__ == "__main__":
+    main()
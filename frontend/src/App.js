@@ -30,6 +30,8 @@ function App() {
   const [asOfDate, setAsOfDate] = useState(null); // 히스토리 상세 조회 시 기준 날짜
   const [deleteParticipantName, setDeleteParticipantName] = useState(null);
   const [latestTodayTimeText, setLatestTodayTimeText] = useState('');
+  const [generationJobId, setGenerationJobId] = useState(null); // 진행 중인 조 생성 작업 ID
+  const [generationProgress, setGenerationProgress] = useState(null); // 최적화 진행 상황 (SSE)
 
   // 시뮬레이티드 어닐링 파라미터
   const [saParams, setSaParams] = useState({
@@ -274,27 +276,68 @@ function App() {
 
   const generateTeamsExecute = async (preserveExisting) => {
     setLoading(true);
+    setGenerationProgress(null);
     try {
-      const response = await axios.post(`${API_BASE_URL}/generate`, {
+      // 조 생성 작업을 제출하고 진행 상황을 Server-Sent Events로 받음
+      const { data: job } = await axios.post(`${API_BASE_URL}/generate/jobs`, {
         participants: attendingParticipants,
         window_days: 60,
         lam: lambdaValue,
         method: generationMethod,
         sa_params: generationMethod === 'simulated_annealing' ? saParams : null,
-        accumulate_same_day: preserveExisting // 팝업에서 선택한 값 적용
+        accumulate_same_day: preserveExisting, // 팝업에서 선택한 값 적용
+        regenerate: preserveExisting // 오늘 이미 만든 조와 다른 결과를 캐시된 해에서 빠르게 탐색
       });
-      setGroups(response.data.groups);
-      setCooccurrenceInfo(response.data.cooccurrence_info);
-      setMethodUsed(response.data.method_used);
+      setGenerationJobId(job.job_id);
+
+      const result = await new Promise((resolve, reject) => {
+        const source = new EventSource(`${API_BASE_URL}/generate/jobs/${job.job_id}/events`);
+        source.addEventListener('progress', (event) => {
+          setGenerationProgress(JSON.parse(event.data));
+        });
+        source.addEventListener('result', (event) => {
+          source.close();
+          resolve(JSON.parse(event.data));
+        });
+        source.addEventListener('error', (event) => {
+          source.close();
+          // 서버가 보낸 error 이벤트에는 data가 있고, 연결 오류에는 없음
+          reject(new Error(event.data ? JSON.parse(event.data).detail : '진행 상황 연결이 끊어졌습니다.'));
+        });
+      });
+
+      setGroups(result.groups);
+      setCooccurrenceInfo(result.cooccurrence_info);
+      setMethodUsed(result.method_used);
       setAsOfDate(null); // 현재 시점 생성이므로 as-of 해제
       setView('results');
+      if (result.status === 'cancelled') {
+        setNotification({
+          show: true,
+          message: '조 생성을 중단했습니다. 지금까지 찾은 가장 좋은 조 편성을 표시합니다.',
+          type: 'success'
+        });
+        setTimeout(() => setNotification({...notification, show: false}), 5000);
+      }
     } catch (error) {
       console.error('조 생성에 실패했습니다:', error);
     }
+    setGenerationJobId(null);
+    setGenerationProgress(null);
     setLoading(false);
     setShowConfirmPopup(false);
   };
 
+  // 진행 중인 조 생성 작업 조기 종료 (최선 해는 유지됨)
+  const cancelGeneration = async () => {
+    if (!generationJobId) return;
+    try {
+      await axios.delete(`${API_BASE_URL}/generate/jobs/${generationJobId}`);
+    } catch (error) {
+      console.error('조 생성 중단에 실패했습니다:', error);
+    }
+  };
+
   const isAttending = (name) => {
     return attendingParticipants.includes(name);
   };
@@ -875,8 +918,21 @@ function App() {
               className="inline-flex items-center px-6 py-3 border border-transparent text-base font-medium rounded-md shadow-sm text-white bg-indigo-600 hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 disabled:bg-gray-400"
             >
               <UserGroupIcon className="h-6 w-6 mr-2" />
-              {loading ? '조 생성 중...' : '참석자로 조 생성하기'}
+              {loading
+                ? (generationProgress
+                    ? `조 생성 중... (${generationProgress.iteration}/${generationProgress.max_iter}, 최선 비용 ${generationProgress.best_cost.toFixed(3)})`
+                    : '조 생성 중...')
+                : '참석자로 조 생성하기'}
             </button>
+            {loading && generationJobId && (
+              <button
+                onClick={cancelGeneration}
+                className="ml-3 inline-flex items-center px-4 py-3 border border-gray-300 text-base font-medium rounded-md shadow-sm text-gray-700 bg-white hover:bg-gray-50 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500"
+              >
+                <XMarkIcon className="h-5 w-5 mr-1" />
+                중단
+              </button>
+            )}
           </div>
         )}
 
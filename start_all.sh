@@ -89,6 +89,27 @@ else
     exit 1
 fi
 
+# 백엔드 캐시 워밍업 완료 대기 (/api/ready가 200을 반환할 때까지)
+READY_TIMEOUT=${READY_TIMEOUT:-60}
+if command -v curl &> /dev/null; then
+    echo -e "${YELLOW}[INFO]${NC} 백엔드 캐시 워밍업 대기 중... (최대 ${READY_TIMEOUT}초)"
+    READY_URL="http://localhost:$BACKEND_PORT/api/ready"
+    READY=false
+    for ((i = 0; i < READY_TIMEOUT; i++)); do
+        READY_CODE=$(curl -s -o /dev/null -w "%{http_code}" --connect-timeout 2 "$READY_URL" 2>/dev/null || echo "000")
+        if [ "$READY_CODE" = "200" ]; then
+            READY=true
+            break
+        fi
+        sleep 1
+    done
+    if [ "$READY" = true ]; then
+        echo -e "${GREEN}[INFO]${NC} 백엔드 준비 완료: $(curl -s "$READY_URL")"
+    else
+        echo -e "${YELLOW}[WARN]${NC} ${READY_TIMEOUT}초 안에 워밍업이 끝나지 않았습니다. 첫 요청이 느릴 수 있습니다."
+    fi
+fi
+
 # 2. 프론트엔드 서버 시작
 echo -e "${GREEN}[2/2]${NC} 프론트엔드 서버 시작 중..."
 
@@ -110,10 +110,30 @@ check_url_accessibility() {
     fi
 }
 
+# 백엔드 캐시 워밍업(준비 상태) 확인 함수
+check_readiness() {
+    local url=$1
+
+    if command -v curl >/dev/null 2>&1; then
+        local body=$(curl -s --connect-timeout 5 -w "\n%{http_code}" "$url" 2>/dev/null || echo "000")
+        local code=$(echo "$body" | tail -n 1)
+        local content=$(echo "$body" | sed '$d')
+
+        if [ "$code" = "200" ]; then
+            echo -e "  🔥 준비 상태: ${GREEN}준비 완료${NC} $content"
+        elif [ "$code" = "503" ]; then
+            echo -e "  🔥 준비 상태: ${YELLOW}워밍업 중${NC} $content"
+        else
+            echo -e "  🔥 준비 상태: ${RED}확인 실패${NC} (HTTP $code)"
+        fi
+    fi
+}
+
 # 백엔드 서버 상태 확인
 check_service_status "백엔드 서버" "uvicorn.*app.main:app" "8000" ".backend.pid"
 check_url_accessibility "http://localhost:8000" "백엔드"
 check_url_accessibility "http://localhost:8000/docs" "백엔드 API 문서"
+check_readiness "http://localhost:8000/api/ready"
 
 # 프론트엔드 서버 상태 확인
 check_service_status "프론트엔드 서버" "npm.*start" "3000" ".frontend.pid"